@@ -1,6 +1,7 @@
 import streamlit as st
 
 from assets import Assets
+from kubegraph.data.cache import memoize
 from kubegraph.data.graph import NetworkGraph, OptimalNetworkGraph
 from kubegraph.solver.ortools import OrToolsSolver
 from utils.types import DataModel, SessionReturn
@@ -38,6 +39,31 @@ def _draw_optimize_network_flow(
     name: str,
     graph: NetworkGraph,
 ) -> OptimalNetworkGraph | None:
+    # NOTE: The supplies are drawn at random, so a solution is reused by
+    # the reruns only until another simulation is asked for
+    simulation_key = f'{name}/simulation'
+    if st.button(
+        key=f'{name}/resimulate',
+        label='Re-simulate',
+    ):
+        st.session_state[simulation_key] = \
+            st.session_state.get(simulation_key, 0) + 1
+
+    return _solve_network_flow(
+        graph,
+        simulation=st.session_state.get(simulation_key, 0),
+    )
+
+
+@memoize(maxsize=8)
+def _solve_network_flow(
+    graph: NetworkGraph,
+    simulation: int,
+) -> OptimalNetworkGraph | None:
+    '''
+    Solve the graph with a random draw of its supplies; `simulation` only
+    tells the draws of the same graph apart.
+    '''
     smcf = OrToolsSolver.with_scalar_network_graph(graph)
     return smcf.solve()
 
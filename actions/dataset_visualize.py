@@ -1,11 +1,25 @@
+from functools import partial
+import tempfile
+from typing import IO
+
 import folium
+from folium.plugins import MarkerCluster
+import polars as pl
 import streamlit as st
 from streamlit_folium import st_folium
 
 from assets import Assets
+from kubegraph.data.coarsen import NetworkGraphCoarsening
 from kubegraph.data.graph import NetworkGraph
+from kubegraph.render.dot import DotEngine, DotRenderer
+from kubegraph.render.pool import RenderJob, RenderPool
 from utils.types import DataModel, SessionReturn
 
+_MAX_CLUSTERS = 64
+_MAX_NODES_TO_VISUALIZE = 256
+_PAGE_SIZES = [25, 100, 500]
+_SUMMARY = '(summary)'
+
 
 async def render(
     assets: Assets,
@@ -48,15 +62,22 @@ async def render(
 
 
 def _draw_action_export(name: str, graph: NetworkGraph) -> None:
-    data = graph.dumps()
+    # NOTE: Deferred until the button is clicked
     st.download_button(
         key=name,
         label='Download your Graph',
         file_name='graph.tar',
-        data=data,
+        data=partial(_dump_to_tempfile, graph),
     )
 
 
+def _dump_to_tempfile(graph: NetworkGraph) -> IO[bytes]:
+    fileobj = tempfile.TemporaryFile()
+    graph.dump(fileobj)
+    fileobj.seek(0)
+    return fileobj
+
+
 def _draw_action_map_world(name: str, graph: NetworkGraph) -> None:
     map = folium.Map(
         crs='EPSG3857',
@@ -64,43 +85,262 @@ def _draw_action_map_world(name: str, graph: NetworkGraph) -> None:
         zoom_control=False,
     )
 
-    # Add nodes
-    for name, *location in graph.nodes.rows_by_key((
-        'name',
-        'latitude',
-        'longitude',
-    )):
-        map.add_child(
-            folium.Marker(
-                location,
-                popup=name,
-                tooltip=name,
+    # Add edges, one polyline per utilization
+    edges = folium.FeatureGroup(name='Edges')
+    for color, segments in graph.to_polylines().items():
+        edges.add_child(
+            folium.PolyLine(
+                locations=segments.tolist(),
+                color=color,
+                opacity=0.8,
+                weight=2,
             )
         )
+    map.add_child(edges)
+
+    # Add nodes
+    nodes = MarkerCluster(name='Nodes')
+    nodes.add_child(
+        folium.GeoJson(
+            data=graph.to_geojson(),
+            tooltip=folium.GeoJsonTooltip(fields=['name']),
+        )
+    )
+    map.add_child(nodes)
 
     # Fit to bounds
-    bounds: list[list[float]] = map.get_bounds()  # type: ignore
-    map.fit_bounds(bounds)
+    bounds = graph.nodes.select(
+        pl.col('latitude', 'longitude').min().name.prefix('min_'),
+        pl.col('latitude', 'longitude').max().name.prefix('max_'),
+    ).row(0)
+    map.fit_bounds([bounds[:2], bounds[2:]])
 
     # Render
     st_folium(
         key=name,
         fig=map,
+        returned_objects=[],
         use_container_width=True,
     )
 
 
 def _draw_action_summary(name: str, graph: NetworkGraph) -> None:
+    summary = graph.summary()
+
+    st.subheader('Overview', divider=True)
+    for column, (key, value) in zip(
+        st.columns(len(summary.totals)),
+        summary.totals.items(),
+    ):
+        column.metric(
+            label=key.title(),
+            value=f'{value:,}',
+        )
+
+    st.subheader('Degree Distribution', divider=True)
+    st.bar_chart(
+        data=summary.degrees,
+        x='degree',
+        y=['in', 'out'],
+        stack=False,
+    )
+
     st.subheader('Nodes', divider=True)
-    st.write(graph.nodes.to_pandas())
+    st.dataframe(summary.nodes, hide_index=True)
+    _draw_rows(f'{name}/nodes', graph.nodes)
+
+    st.subheader('Node Statistics', divider=True)
+    _draw_rows(f'{name}/statistics', graph.statistics().nodes)
 
     st.subheader('Edges', divider=True)
-    st.write(graph.edges.to_pandas())
+    st.dataframe(summary.edges, hide_index=True)
+    _draw_rows(f'{name}/edges', graph.edges)
+
+
+def _draw_rows(name: str, df: pl.DataFrame) -> None:
+    # NOTE: Send only the visible page to the browser
+    page_size_column, page_column = st.columns(2)
+    page_size = page_size_column.selectbox(
+        key=f'{name}/page_size',
+        label='Rows per page',
+        options=_PAGE_SIZES,
+    ) or _PAGE_SIZES[0]
+    num_pages = max((df.height + page_size - 1) // page_size, 1)
+    page = page_column.number_input(
+        key=f'{name}/page',
+        label=f'Page (of {num_pages})',
+        min_value=1,
+        max_value=num_pages,
+        step=1,
+    )
+    st.dataframe(
+        df.slice((int(page) - 1) * page_size, page_size),
+        hide_index=True,
+    )
 
 
 def _draw_action_visualize(name: str, graph: NetworkGraph) -> None:
     st.subheader('Graph Visualization', divider=True)
-    st.graphviz_chart(
-        figure_or_dot=graph.to_graphviz(),
-        use_container_width=True,
+
+    if graph.nodes.height > _MAX_NODES_TO_VISUALIZE:
+        graph = _draw_level_of_detail(name, graph)
+    _draw_graph(name, graph)
+
+
+def _draw_graph(name: str, graph: NetworkGraph) -> None:
+    # NOTE: Ordered
+    renderers = {
+        'Browser': RenderJob.Graphviz,
+        'Browser (interactive)': RenderJob.Vis,
+        'Server (matplotlib)': RenderJob.Matplotlib,
+        **{
+            f'Server ({engine.value})': engine
+            for engine in DotEngine
+        },
+    }
+    selected_renderer = st.selectbox(
+        key=f'{name}/renderer',
+        label='Choose one of renderers',
+        options=renderers.keys(),
+    )
+    renderer = renderers[selected_renderer or 'Browser']
+
+    # NOTE: Filled in when the result arrives
+    placeholder = st.empty()
+    placeholder.info('🔥 Rendering...')
+    try:
+        match renderer:
+            case DotEngine():
+                placeholder.image(
+                    image=_load_dot_renderer().render(
+                        graph=graph,
+                        engine=renderer,
+                    ),
+                    use_container_width=True,
+                )
+            case RenderJob.Graphviz:
+                placeholder.graphviz_chart(
+                    figure_or_dot=_load_render_pool().render(
+                        graph=graph,
+                        job=renderer,
+                    ),
+                    use_container_width=True,
+                )
+            case RenderJob.Matplotlib:
+                placeholder.image(
+                    image=_load_render_pool().render(
+                        graph=graph,
+                        job=renderer,
+                    ),
+                    use_container_width=True,
+                )
+            case RenderJob.Vis:
+                html = _load_render_pool().render(
+                    graph=graph,
+                    job=renderer,
+                )
+                with placeholder:
+                    st.components.v1.html(
+                        html=html,
+                        height=600,
+                    )
+    except (TimeoutError, ValueError) as error:
+        placeholder.warning(f'Failed to render graph :( ({error})')
+
+
+def _draw_level_of_detail(name: str, graph: NetworkGraph) -> NetworkGraph:
+    st.info(
+        f'This graph has {graph.nodes.height} nodes; '
+        'showing a summary of its clusters.',
+    )
+
+    # NOTE: Ordered
+    methods = {
+        'Label Propagation': (NetworkGraphCoarsening.LabelPropagation, None),
+        'Connected Components': (NetworkGraphCoarsening.Component, None),
+        **{
+            f'Attribute: {key}': (NetworkGraphCoarsening.Attribute, key)
+            for key, dtype in graph.nodes.schema.items()
+            if key != 'name' and dtype == pl.String
+        },
+    }
+    selected_method = st.selectbox(
+        key=f'{name}/coarsening',
+        label='Choose one of clustering methods',
+        options=methods.keys(),
+    )
+    selected_method = selected_method or 'Label Propagation'
+
+    # NOTE: A single cluster is no summary at all (e.g. label propagation
+    # on a densely mixed graph), so try the other methods in turn.
+    for candidate in [
+        selected_method,
+        *(other for other in methods if other != selected_method),
+    ]:
+        method, key = methods[candidate]
+        summary = graph.coarsen(
+            method=method,
+            key=key,
+            max_clusters=_MAX_CLUSTERS,
+        )
+        if summary.nodes.height > 1:
+            break
+    else:
+        st.warning(
+            'No clustering method splits this graph; '
+            f'showing the top {_MAX_NODES_TO_VISUALIZE} nodes by traffic.',
+        )
+        return _sample_by_traffic(graph)
+    if candidate != selected_method:
+        st.warning(
+            f'{selected_method} finds a single cluster; '
+            f'falling back to {candidate}.',
+        )
+
+    selected_cluster = st.selectbox(
+        key=f'{name}/cluster',
+        label='Choose a cluster to drill down',
+        options=[
+            _SUMMARY,
+            *summary.nodes.sort('size', descending=True)['name'],
+        ],
+    )
+    if selected_cluster is None or selected_cluster == _SUMMARY:
+        return summary
+
+    clusters = graph.clusters(
+        method=method,
+        key=key,
+        max_clusters=_MAX_CLUSTERS,
+    )
+    subgraph = graph.subgraph(
+        clusters.filter(pl.col('cluster') == selected_cluster)['name'],
     )
+    if subgraph.nodes.height > _MAX_NODES_TO_VISUALIZE:
+        return _draw_level_of_detail(f'{name}/{selected_cluster}', subgraph)
+    return subgraph
+
+
+def _sample_by_traffic(graph: NetworkGraph) -> NetworkGraph:
+    '''
+    Take the endpoints of the heaviest edges, up to the drawable limit.
+    '''
+    weight = 'traffic' if 'traffic' in graph.edges.columns else 'capacity'
+    names = graph.edges \
+        .sort(weight, descending=True, nulls_last=True) \
+        .select(pl.concat_list('start', 'end').alias('name')) \
+        .explode('name') \
+        .unique(maintain_order=True) \
+        .head(_MAX_NODES_TO_VISUALIZE) \
+        .get_column('name')
+    return graph.subgraph(names)
+
+
+@st.cache_resource(ttl=None)
+def _load_dot_renderer() -> DotRenderer:
+    return DotRenderer()
+
+
+@st.cache_resource(ttl=None)
+def _load_render_pool() -> RenderPool:
+    return RenderPool()
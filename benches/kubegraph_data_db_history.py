@@ -0,0 +1,85 @@
+import argparse
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import tempfile
+import time
+
+import polars as pl
+
+from kubegraph.data.db.history import LocalNetworkGraphHistory
+from kubegraph.data.series import NetworkGraphSeries
+from synthetic import build_graph
+
+
+def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--num_days',
+        default=365,
+        help='how many days of per-minute steps to append',
+        type=int,
+    )
+    parser.add_argument(
+        '--num_edges',
+        default=20,
+        help='how many edges the synthetic graph has',
+        type=int,
+    )
+    parser.add_argument(
+        '--save_dir',
+        default=None,
+        help='where to save the history (default: a temporary directory)',
+        type=Path,
+    )
+    args = parser.parse_args()
+
+    graph = build_graph(args.num_edges)
+    series = NetworkGraphSeries(
+        edges=graph.edges.with_columns(std=pl.lit(100)),
+        nodes=graph.nodes,
+        timestamp='2024-01-01T00:00:00Z',
+        step_unit='1m',
+    )
+    origin = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    with tempfile.TemporaryDirectory(dir=args.save_dir) as save_dir:
+        history = LocalNetworkGraphHistory(base_dir=save_dir)
+
+        # NOTE: Append a day of steps at once, as one file per partition
+        begin = time.perf_counter()
+        for day in range(args.num_days):
+            edges, nodes = series.step(day * 1440).simulate(1440)
+            history.append_frames(
+                kind='bench',
+                namespace='history',
+                edges=edges.drop('step'),
+                nodes=nodes.drop('step'),
+            )
+        elapsed = time.perf_counter() - begin
+        print(f'append {args.num_days} days: {elapsed:.3f} s')
+
+        print(f'{'range':>8} {'every':>8} {'tier':>8} {'rows':>12} '
+              f'{'query [ms]':>12}')
+        for days in (1, 7, 30, args.num_days):
+            start = origin + timedelta(days=args.num_days - days)
+            for every in ('1m', '1h', '1d'):
+                begin = time.perf_counter()
+                edges, _ = history.scan(
+                    kind='bench',
+                    namespace='history',
+                    start=start,
+                    every=every,
+                )
+                df = edges \
+                    .group_by('start', 'end') \
+                    .agg(pl.col('traffic_max').max(), pl.len()) \
+                    .collect()
+                elapsed = time.perf_counter() - begin
+                print(f'{f'{days}d':>8} {every:>8} '
+                      f'{history.rollup_for(every) or '-':>8} '
+                      f'{df['len'].sum():>12} {elapsed * 1000:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import multiprocessing
+import os
+from pathlib import Path
+import resource
+import tempfile
+import time
+
+from kubegraph.data.archive import NetworkGraphArchiveFormat
+from kubegraph.data.graph import NetworkGraph
+from synthetic import build_graph
+
+
+def _rss_bytes() -> int:
+    # NOTE: Linux only; the second field is the resident set in pages
+    with open('/proc/self/statm', 'r') as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+def _measure_open(
+    path: Path,
+    results: 'multiprocessing.Queue[tuple[float, int]]',
+) -> None:
+    baseline = _rss_bytes()
+    begin = time.perf_counter()
+    graph = NetworkGraph.load(path)
+    elapsed = time.perf_counter() - begin
+    results.put((elapsed, _rss_bytes() - baseline))
+    del graph
+
+
+def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--num_edges',
+        default=[10_000, 100_000, 1_000_000, 10_000_000],
+        help='how many edges the synthetic graphs have',
+        nargs='+',
+        type=int,
+    )
+    parser.add_argument(
+        '--save_dir',
+        default=None,
+        help='where to save archives (default: a temporary directory)',
+        type=Path,
+    )
+    args = parser.parse_args()
+
+    # NOTE: Measure every open in a fresh process to isolate the RSS
+    ctx = multiprocessing.get_context('spawn')
+
+    with tempfile.TemporaryDirectory(dir=args.save_dir) as save_dir:
+        print(f'{'edges':>12} {'format':>8} {'size [MiB]':>12} '
+              f'{'open [ms]':>10} {'rss [MiB]':>10}')
+        for num_edges in args.num_edges:
+            graph = build_graph(num_edges)
+            for format in NetworkGraphArchiveFormat:
+                path = Path(save_dir) / f'graph-{num_edges}.{format.value}.tar'
+                graph.dump(path, format)
+
+                results = ctx.Queue()
+                process = ctx.Process(
+                    target=_measure_open,
+                    args=(path, results),
+                )
+                process.start()
+                elapsed, rss = results.get()
+                process.join()
+
+                print(f'{num_edges:>12} {format.value:>8} '
+                      f'{os.path.getsize(path) / 2**20:>12.1f} '
+                      f'{elapsed * 1e3:>10.1f} {rss / 2**20:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
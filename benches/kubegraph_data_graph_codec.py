@@ -0,0 +1,80 @@
+import argparse
+from io import BytesIO
+import time
+
+from kubegraph.data.archive import NetworkGraphArchiveFormat
+from kubegraph.data.graph import NetworkGraph
+from synthetic import build_graph
+
+_CODECS = [
+    ('uncompressed', None),
+    ('snappy', None),
+    ('lz4', None),
+    ('zstd', 1),
+    ('zstd', 3),
+    ('zstd', 9),
+]
+
+
+def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--format',
+        default=NetworkGraphArchiveFormat.Parquet.value,
+        choices=[format.value for format in NetworkGraphArchiveFormat],
+        help='which archive format to be measured',
+        type=str,
+    )
+    parser.add_argument(
+        '--num_edges',
+        default=[10_000, 100_000, 1_000_000, 10_000_000],
+        help='how many edges the synthetic graphs have',
+        nargs='+',
+        type=int,
+    )
+    parser.add_argument(
+        '--repeat',
+        default=3,
+        help='how many times to repeat each measurement (best is kept)',
+        type=int,
+    )
+    args = parser.parse_args()
+
+    print(f'{'edges':>12} {'codec':>14} {'size [MiB]':>12} '
+          f'{'ratio':>6} {'write [ms]':>11} {'read [ms]':>10}')
+    for num_edges in args.num_edges:
+        graph = build_graph(num_edges)
+
+        baseline = None
+        for compression, level in _CODECS:
+            if args.format == NetworkGraphArchiveFormat.Arrow.value \
+                    and compression == 'snappy':
+                continue
+
+            write_times = []
+            read_times = []
+            for _ in range(args.repeat):
+                buffer = BytesIO()
+                begin = time.perf_counter()
+                graph.dump(buffer, args.format, compression, level)
+                write_times.append(time.perf_counter() - begin)
+
+                buffer.seek(0)
+                begin = time.perf_counter()
+                NetworkGraph.load(buffer)
+                read_times.append(time.perf_counter() - begin)
+
+            size = buffer.getbuffer().nbytes
+            if baseline is None:
+                baseline = size
+
+            codec = compression if level is None else f'{compression}:{level}'
+            print(f'{num_edges:>12} {codec:>14} {size / 2**20:>12.1f} '
+                  f'{baseline / size:>6.2f} '
+                  f'{min(write_times) * 1e3:>11.1f} '
+                  f'{min(read_times) * 1e3:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
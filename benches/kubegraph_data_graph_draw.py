@@ -0,0 +1,41 @@
+import argparse
+from io import BytesIO
+import time
+
+from synthetic import build_graph
+
+
+def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--num_edges',
+        default=[5_000, 50_000, 500_000],
+        help='how many edges the synthetic graphs have',
+        nargs='+',
+        type=int,
+    )
+    args = parser.parse_args()
+
+    print(f'{'edges':>12} {'nodes':>8} {'artists [ms]':>13} '
+          f'{'png [ms]':>10}')
+    for num_edges in args.num_edges:
+        graph = build_graph(num_edges)
+
+        # NOTE: Warm up the adjacency and the layout
+        graph.adjacency()
+        graph.layout()
+
+        begin = time.perf_counter()
+        fig = graph.draw_with_matplotlib(show=False)
+        artists = time.perf_counter() - begin
+
+        fig.savefig(BytesIO(), format='png')
+        png = time.perf_counter() - begin
+
+        print(f'{num_edges:>12} {graph.nodes.height:>8} '
+              f'{artists * 1e3:>13.1f} {png * 1e3:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
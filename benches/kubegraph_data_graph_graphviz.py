@@ -0,0 +1,55 @@
+import argparse
+import time
+
+import numpy as np
+import polars as pl
+
+from kubegraph.data.graph import NetworkGraph
+from synthetic import build_graph
+
+
+def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--num_edges',
+        default=[10_000, 100_000, 1_000_000],
+        help='how many edges the synthetic graphs have',
+        nargs='+',
+        type=int,
+    )
+    parser.add_argument(
+        '--repeat',
+        default=3,
+        help='how many times to repeat each measurement (best is kept)',
+        type=int,
+    )
+    args = parser.parse_args()
+
+    print(f'{'edges':>12} {'dot [ms]':>10} {'source [MiB]':>13}')
+    for num_edges in args.num_edges:
+        graph = build_graph(num_edges)
+
+        # NOTE: Render the solved (traffic-annotated) variant of the graph
+        rng = np.random.default_rng(42)
+        graph = NetworkGraph(
+            edges=graph.edges,
+            nodes=graph.nodes.with_columns(
+                loss=pl.lit(rng.integers(0, 100, graph.nodes.height)),
+                gain=pl.lit(rng.integers(0, 100, graph.nodes.height)),
+            ),
+        )
+
+        elapsed = []
+        for _ in range(args.repeat):
+            # NOTE: Bypass the fingerprint cache
+            begin = time.perf_counter()
+            source = NetworkGraph.to_graphviz.__wrapped__(graph).source
+            elapsed.append(time.perf_counter() - begin)
+
+        print(f'{num_edges:>12} {min(elapsed) * 1e3:>10.1f} '
+              f'{len(source) / 2**20:>13.1f}')
+
+
+if __name__ == '__main__':
+    main()
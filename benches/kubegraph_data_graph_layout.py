@@ -0,0 +1,65 @@
+import argparse
+import time
+
+import numpy as np
+
+from kubegraph.data.graph import NetworkGraph
+from synthetic import build_graph
+
+
+def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--num_edges',
+        default=[5_000, 50_000, 500_000],
+        help='how many edges the synthetic graphs have',
+        nargs='+',
+        type=int,
+    )
+    parser.add_argument(
+        '--churn',
+        default=0.05,
+        help='the ratio of the edges to be dropped in the next snapshot',
+        type=float,
+    )
+    args = parser.parse_args()
+
+    print(f'{'edges':>12} {'nodes':>8} {'default [ms]':>13} '
+          f'{'cold [ms]':>10} {'warm [ms]':>10} {'moved':>8}')
+    for num_edges in args.num_edges:
+        graph = build_graph(num_edges)
+
+        # NOTE: Bypass the fingerprint cache
+        begin = time.perf_counter()
+        NetworkGraph.layout.__wrapped__(graph)
+        default = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        layout = NetworkGraph.layout.__wrapped__(graph, 'force_directed')
+        cold = time.perf_counter() - begin
+
+        snapshot = NetworkGraph(
+            edges=graph.edges.sample(fraction=1 - args.churn, seed=42),
+            nodes=graph.nodes,
+        )
+        begin = time.perf_counter()
+        warm_layout = NetworkGraph.layout.__wrapped__(
+            snapshot,
+            initial=layout,
+        )
+        warm = time.perf_counter() - begin
+
+        # Median displacement, relative to the extent of the layout
+        positions = layout.select('x', 'y').to_numpy()
+        moved = np.median(np.hypot(
+            *(warm_layout.select('x', 'y').to_numpy() - positions).T,
+        )) / np.ptp(positions, axis=0).max()
+
+        print(f'{num_edges:>12} {graph.nodes.height:>8} '
+              f'{default * 1e3:>13.1f} {cold * 1e3:>10.1f} '
+              f'{warm * 1e3:>10.1f} {moved:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import time
+
+import numpy as np
+
+from kubegraph.data.window import RollingWindow
+
+
+def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--num_edges',
+        default=10_000,
+        help='how many edges are tracked',
+        type=int,
+    )
+    parser.add_argument(
+        '--num_steps',
+        default=2_000,
+        help='how many steps are pushed',
+        type=int,
+    )
+    parser.add_argument(
+        '--sizes',
+        default=[10, 100, 1_000],
+        help='the window sizes to measure',
+        nargs='+',
+        type=int,
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    steps = rng.uniform(0, 1, (64, args.num_edges))
+
+    print(f'{'size':>8} {'incremental [us]':>18} {'recompute [us]':>16}')
+    for size in args.sizes:
+        window = RollingWindow(size=size, width=args.num_edges)
+        begin = time.perf_counter()
+        for step in range(args.num_steps):
+            window.push(steps[step % steps.shape[0]])
+            window.mean, window.max
+        incremental = (time.perf_counter() - begin) / args.num_steps
+
+        # NOTE: The baseline aggregates the whole window at every step
+        history = np.zeros((size, args.num_edges))
+        begin = time.perf_counter()
+        for step in range(args.num_steps):
+            history[step % size] = steps[step % steps.shape[0]]
+            history.mean(axis=0), history.max(axis=0)
+        recompute = (time.perf_counter() - begin) / args.num_steps
+
+        print(f'{size:>8} {incremental * 1e6:>18.1f} {recompute * 1e6:>16.1f}')
+
+
+if __name__ == '__main__':
+    main()
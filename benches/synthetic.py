@@ -0,0 +1,29 @@
+import numpy as np
+import polars as pl
+
+from kubegraph.data.graph import NetworkGraph
+
+
+def build_graph(num_edges: int, seed: int = 42) -> NetworkGraph:
+    rng = np.random.default_rng(seed)
+    num_nodes = max(num_edges // 10, 2)
+    names = pl.Series(
+        name='name',
+        values=np.arange(num_nodes),
+    ).cast(pl.String).str.pad_start(9, '0')
+
+    return NetworkGraph(
+        edges=pl.DataFrame({
+            'start': names.gather(rng.integers(0, num_nodes, num_edges)),
+            'end': names.gather(rng.integers(0, num_nodes, num_edges)),
+            'capacity': rng.integers(0, 1_000, num_edges),
+            'cost': rng.integers(0, 100, num_edges),
+            'traffic': rng.integers(0, 1_000, num_edges),
+        }),
+        nodes=pl.DataFrame({
+            'name': names,
+            'latitude': rng.uniform(-90, 90, num_nodes),
+            'longitude': rng.uniform(-180, 180, num_nodes),
+            'traffic': rng.integers(-1_000, 1_000, num_nodes),
+        }),
+    )
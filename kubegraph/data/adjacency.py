@@ -0,0 +1,138 @@
+import numpy as np
+import polars as pl
+from pydantic import BaseModel
+from scipy.sparse import csr_array
+
+
+class NetworkGraphAdjacency(BaseModel, arbitrary_types_allowed=True):
+    '''
+    A compact, integer-indexed representation of a network graph.
+
+    Node names are dictionary-encoded into dense ids (the row order of the
+    nodes frame, followed by any endpoint missing from it). Outgoing edges
+    are stored in CSR form and incoming edges in CSC form; `*_edges` map
+    every CSR/CSC slot back to its row in the edges frame, so that edge
+    attributes can be gathered with `edge_values`.
+    '''
+
+    names: pl.Series
+
+    start_ids: np.ndarray
+    end_ids: np.ndarray
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    out_edges: np.ndarray
+
+    in_indptr: np.ndarray
+    in_indices: np.ndarray
+    in_edges: np.ndarray
+
+    @classmethod
+    def from_frames(
+        cls,
+        edges: pl.DataFrame,
+        nodes: pl.DataFrame,
+    ) -> 'NetworkGraphAdjacency':
+        names = nodes.get_column('name').alias('name')
+
+        def encode(key: str) -> pl.Series:
+            return edges.get_column(key).replace_strict(
+                old=names,
+                new=pl.int_range(names.len(), dtype=pl.Int64, eager=True),
+                default=None,
+                return_dtype=pl.Int64,
+            )
+
+        start_ids = encode('start')
+        end_ids = encode('end')
+
+        # NOTE: Append the endpoints missing from the nodes, if any
+        if start_ids.has_nulls() or end_ids.has_nulls():
+            missing = pl.concat([
+                edges.get_column('start').filter(start_ids.is_null()),
+                edges.get_column('end').filter(end_ids.is_null()),
+            ]).unique(maintain_order=True)
+            names = pl.concat([names, missing.alias('name')])
+            start_ids = encode('start')
+            end_ids = encode('end')
+
+        start_ids = start_ids.to_numpy()
+        end_ids = end_ids.to_numpy()
+        num_nodes = names.len()
+
+        indptr, out_edges = _compress(start_ids, num_nodes)
+        in_indptr, in_edges = _compress(end_ids, num_nodes)
+
+        return cls(
+            names=names,
+            start_ids=start_ids,
+            end_ids=end_ids,
+            indptr=indptr,
+            indices=end_ids[out_edges],
+            out_edges=out_edges,
+            in_indptr=in_indptr,
+            in_indices=start_ids[in_edges],
+            in_edges=in_edges,
+        )
+
+    @property
+    def num_edges(self) -> int:
+        return self.start_ids.size
+
+    @property
+    def num_nodes(self) -> int:
+        return self.names.len()
+
+    def edge_values(
+        self,
+        edges: pl.DataFrame,
+        key: str,
+        order: np.ndarray | None = None,
+    ) -> np.ndarray:
+        '''
+        Gather an edge attribute, in CSR order unless `order` is given
+        (e.g. `in_edges` for the CSC order).
+        '''
+        values = edges.get_column(key).to_numpy()
+        return values[self.out_edges if order is None else order]
+
+    def in_degree(self) -> np.ndarray:
+        return np.diff(self.in_indptr)
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def node_ids(self, names: pl.Series | list[str]) -> np.ndarray:
+        return pl.Series(values=names, dtype=pl.String).replace_strict(
+            old=self.names,
+            new=pl.int_range(self.num_nodes, dtype=pl.Int64, eager=True),
+            return_dtype=pl.Int64,
+        ).to_numpy()
+
+    def predecessors(self, node: int) -> np.ndarray:
+        return self.in_indices[self.in_indptr[node]:self.in_indptr[node + 1]]
+
+    def successors(self, node: int) -> np.ndarray:
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def to_scipy(self, weights: np.ndarray | None = None) -> csr_array:
+        '''
+        Convert into a scipy sparse array; `weights` are in CSR order.
+        '''
+        if weights is None:
+            weights = np.ones(self.num_edges, dtype=np.int64)
+        return csr_array(
+            (weights, self.indices, self.indptr),
+            shape=(self.num_nodes, self.num_nodes),
+        )
+
+
+def _compress(
+    ids: np.ndarray,
+    num_nodes: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(ids, kind='stable')
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ids, minlength=num_nodes), out=indptr[1:])
+    return indptr, order
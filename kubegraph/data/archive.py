@@ -0,0 +1,385 @@
+from enum import Enum
+from io import BytesIO
+import json
+from pathlib import Path
+from tarfile import (
+    BLOCKSIZE, DEFAULT_FORMAT, ENCODING, NUL, RECORDSIZE, TarFile, TarInfo,
+)
+from tempfile import SpooledTemporaryFile
+from types import TracebackType
+from typing import IO, Any, Callable, Iterable, Iterator, Literal, Self
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+NetworkGraphArchiveCompression = Literal[
+    'uncompressed',
+    'lz4',
+    'snappy',
+    'zstd',
+]
+
+
+class NetworkGraphArchiveFormat(Enum):
+    '''
+    The encoding of the dataframes stored in a graph archive.
+
+    Both formats are stored in an uncompressed tar container. Tar members
+    are aligned to 512 bytes, so Arrow IPC members can be memory-mapped
+    straight from the archive file without any copy or decoding.
+    '''
+
+    Arrow = 'arrow'
+    Parquet = 'parquet'
+
+    @classmethod
+    def default(cls) -> 'NetworkGraphArchiveFormat':
+        return cls.Parquet
+
+    @property
+    def default_compression(
+        self,
+    ) -> tuple[NetworkGraphArchiveCompression, int | None]:
+        match self:
+            # NOTE: Compressed Arrow IPC members cannot be memory-mapped
+            case NetworkGraphArchiveFormat.Arrow:
+                return 'uncompressed', None
+            # NOTE: See `benches/kubegraph_data_graph_codec.py`
+            case NetworkGraphArchiveFormat.Parquet:
+                return 'zstd', 1
+
+    @property
+    def extension(self) -> str:
+        return self.value
+
+
+# NOTE: Identity columns are always loaded to keep the graph well-formed
+_IDENTITY_COLUMNS = ('name', 'start', 'end')
+
+# NOTE: The identity (and the reference) columns repeat in every incident
+# edge, so they are dictionary-encoded in parquet, with pages large enough
+# to keep the dictionaries of the large graphs as well; the Arrow members
+# keep them plain, as decoding them would defeat the memory mapping
+_DICTIONARY_COLUMNS = (*_IDENTITY_COLUMNS, 'kind', 'namespace')
+_DICTIONARY_PAGE_SIZE = 1 << 24
+
+
+class NetworkGraphArchiveReader:
+    def __init__(
+        self,
+        fileobj: str | Path | IO[bytes],
+        columns: Iterable[str] | None = None,
+    ) -> None:
+        self.columns = set(columns) | set(_IDENTITY_COLUMNS) \
+            if columns is not None \
+            else None
+
+        if isinstance(fileobj, (str, Path)):
+            self._archive = TarFile(
+                name=fileobj,
+                mode='r',
+            )
+            # NOTE: Zero-copy view of the whole archive
+            self._source: pa.Buffer | None = pa.memory_map(
+                str(fileobj),
+                'r',
+            ).read_buffer()
+        else:
+            self._archive = TarFile(
+                fileobj=fileobj,  # type: ignore
+                mode='r',
+            )
+            # NOTE: The loaded frames outlive the in-memory archive (e.g.
+            # uploads), which its owner may close or write to; `getvalue`
+            # shares the bytes rather than exporting the buffer, and only
+            # copies them if the archive is written to afterwards
+            self._source = pa.py_buffer(fileobj.getvalue()) \
+                if isinstance(fileobj, BytesIO) \
+                else None
+
+        self._members = {
+            info.name: info
+            for info in self._archive.getmembers()
+        }
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._archive.close()
+
+    def read_dataframe(
+        self,
+        name: str,
+        predicate: pl.Expr | None = None,
+    ) -> pl.DataFrame:
+        info = self._members.get(
+            f'{name}.{NetworkGraphArchiveFormat.Arrow.extension}',
+        )
+        if info is not None:
+            lf = self._scan_ipc(info)
+        elif (info := self._members.get(
+            f'{name}.{NetworkGraphArchiveFormat.Parquet.extension}',
+        )) is not None:
+            lf = self._scan_parquet(info)
+        else:
+            raise ValueError(f'Empty {name} data')
+
+        # NOTE: Both are pushed down into the parquet scan, which skips the
+        # row groups by their statistics and decodes the selected columns.
+        # The filter goes first, as it may read the unselected columns.
+        if predicate is not None:
+            lf = lf.filter(predicate)
+        if self.columns is not None:
+            lf = lf.select(
+                column
+                for column in lf.collect_schema().names()
+                if column in self.columns
+            )
+        return lf.collect()
+
+    def read_json(
+        self,
+        name: str,
+    ) -> Any:
+        buffer = self._archive.extractfile(f'{name}.json')
+        if buffer is None:
+            raise ValueError(f'Empty {name} data')
+        return json.load(buffer)
+
+    def _read_buffer(
+        self,
+        info: TarInfo,
+    ) -> pa.Buffer:
+        if self._source is not None:
+            return self._source.slice(info.offset_data, info.size)
+
+        buffer = self._archive.extractfile(info)
+        if buffer is None:
+            raise ValueError(f'Empty {info.name} data')
+        return pa.py_buffer(buffer.read())
+
+    def _scan_ipc(
+        self,
+        info: TarInfo,
+    ) -> pl.LazyFrame:
+        table = pa.ipc.open_file(self._read_buffer(info)).read_all()
+        df: pl.DataFrame = pl.from_arrow(table, rechunk=False)  # type: ignore
+        return df.lazy()
+
+    def _scan_parquet(
+        self,
+        info: TarInfo,
+    ) -> pl.LazyFrame:
+        if self._source is None:
+            buffer = self._archive.extractfile(info)
+            if buffer is None:
+                raise ValueError(f'Empty {info.name} data')
+            return pl.scan_parquet(buffer)
+
+        # NOTE: The member is sliced out of the (memory-mapped) archive as
+        # the IPC ones are; the native reader still copies the compressed
+        # bytes once, which decodes much faster than a zero-copy pyarrow
+        # dataset would
+        return pl.scan_parquet(pa.BufferReader(self._read_buffer(info)))
+
+
+class NetworkGraphArchiveWriter:
+    '''
+    A streaming writer of graph archives.
+
+    Members are only recorded by `write_*`; they are serialized one at a
+    time when the archive is iterated (or closed), row group by row group
+    into a spooled temporary file, and then copied into the tar stream in
+    fixed-size chunks. The peak memory is therefore about one row group,
+    and the chunks can feed a chunked download response directly.
+    '''
+
+    def __init__(
+        self,
+        fileobj: str | Path | IO[bytes] | None = None,
+        format: NetworkGraphArchiveFormat | str | None = None,
+        *,
+        compression: NetworkGraphArchiveCompression | None = None,
+        compression_level: int | None = None,
+        chunk_size: int = 1 << 20,
+        row_group_size: int = 1 << 17,
+    ) -> None:
+        if format is None:
+            format = NetworkGraphArchiveFormat.default()
+        elif isinstance(format, str):
+            format = NetworkGraphArchiveFormat(format)
+        self.format = format
+
+        if compression is None:
+            compression, compression_level = format.default_compression
+
+        # NOTE: Arrow IPC does not support snappy
+        if format == NetworkGraphArchiveFormat.Arrow \
+                and compression == 'snappy':
+            raise ValueError(
+                f'Unsupported compression for {format.value}: {compression}',
+            )
+        self.compression = compression
+        self.compression_level = compression_level
+
+        self.chunk_size = chunk_size
+        self.row_group_size = row_group_size
+
+        self._fileobj = fileobj
+        self._members: list[tuple[str, Callable[[IO[bytes]], Any]]] = []
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+
+    def __iter__(self) -> Iterator[bytes]:
+        offset = 0
+        for name, serialize in self._members:
+            with SpooledTemporaryFile(max_size=self.chunk_size) as buffer:
+                serialize(buffer)  # type: ignore
+
+                info = TarInfo(name)
+                info.size = buffer.tell()
+                header = info.tobuf(
+                    format=DEFAULT_FORMAT,
+                    encoding=ENCODING,
+                    errors='surrogateescape',
+                )
+                yield header
+                offset += len(header)
+
+                buffer.seek(0)
+                while chunk := buffer.read(self.chunk_size):
+                    yield chunk
+                offset += info.size
+
+            # NOTE: Align the next member to the tar block size
+            if remainder := offset % BLOCKSIZE:
+                yield NUL * (BLOCKSIZE - remainder)
+                offset += BLOCKSIZE - remainder
+
+        # NOTE: End-of-archive marker, padded up to the record size
+        trailer = 2 * BLOCKSIZE
+        if remainder := (offset + trailer) % RECORDSIZE:
+            trailer += RECORDSIZE - remainder
+        yield NUL * trailer
+
+    def close(self) -> None:
+        match self._fileobj:
+            case None:
+                return
+            case str() | Path():
+                with open(self._fileobj, 'wb') as fileobj:
+                    self._write_to(fileobj)
+            case fileobj:
+                self._write_to(fileobj)
+        self._fileobj = None
+
+    def write_dataframe(
+        self,
+        name: str,
+        df: pl.DataFrame,
+    ) -> None:
+        match self.format:
+            case NetworkGraphArchiveFormat.Arrow:
+                serialize = self._serialize_ipc
+            case NetworkGraphArchiveFormat.Parquet:
+                serialize = self._serialize_parquet
+
+        self._members.append((
+            f'{name}.{self.format.extension}',
+            lambda buffer: serialize(buffer, df),
+        ))
+
+    def write_json(
+        self,
+        name: str,
+        data: Any,
+    ) -> None:
+        value = json.dumps(data).encode('utf-8')
+        self._members.append((
+            f'{name}.json',
+            lambda buffer: buffer.write(value),
+        ))
+
+    def _iter_batches(
+        self,
+        df: pl.DataFrame,
+        compat_level: pl.CompatLevel | None = None,
+    ) -> Iterator[pa.RecordBatch]:
+        for offset in range(0, df.height, self.row_group_size):
+            yield from df.slice(offset, self.row_group_size) \
+                .to_arrow(compat_level=compat_level) \
+                .to_batches()
+
+    def _serialize_ipc(
+        self,
+        buffer: IO[bytes],
+        df: pl.DataFrame,
+    ) -> None:
+        # NOTE: Keep the native string views of polars, so that the frames
+        # are loaded from the memory map as they are, without any copy
+        compat_level = pl.CompatLevel.newest()
+        schema = df.head(0).to_arrow(compat_level=compat_level).schema
+        options = pa.ipc.IpcWriteOptions(
+            compression=pa.Codec(
+                compression=self.compression,
+                compression_level=self.compression_level,
+            ) if self.compression != 'uncompressed' else None,
+        )
+        with pa.ipc.new_file(buffer, schema, options=options) as writer:
+            for batch in self._iter_batches(df, compat_level):
+                writer.write_batch(batch)
+
+    def _serialize_parquet(
+        self,
+        buffer: IO[bytes],
+        df: pl.DataFrame,
+    ) -> None:
+        schema = df.head(0).to_arrow().schema
+        with pq.ParquetWriter(
+            buffer,
+            schema,
+            compression='none'
+            if self.compression == 'uncompressed'
+            else self.compression,
+            compression_level=self.compression_level,
+            use_dictionary=_dictionary_columns(df),
+            dictionary_pagesize_limit=_DICTIONARY_PAGE_SIZE,
+        ) as writer:
+            for batch in self._iter_batches(df):
+                writer.write_batch(batch, row_group_size=self.row_group_size)
+
+    def _write_to(
+        self,
+        fileobj: IO[bytes],
+    ) -> None:
+        for chunk in self:
+            fileobj.write(chunk)
+
+
+def _dictionary_columns(df: pl.DataFrame) -> list[str]:
+    return [
+        column
+        for column, dtype in df.schema.items()
+        if column in _DICTIONARY_COLUMNS and dtype == pl.String
+    ]
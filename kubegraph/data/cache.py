@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from typing import Any, Callable, Hashable, Protocol
+
+import polars as pl
+
+
+class Fingerprinted(Protocol):
+    def fingerprint(self) -> str:
+        ...
+
+
+class FingerprintCache[T]:
+    '''
+    A bounded LRU cache keyed by the content fingerprint of a graph.
+
+    The cache is shared by every session served by the same process, so
+    identical graphs loaded by different reruns hit the same entries.
+    '''
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self._entries: OrderedDict[Hashable, T] = OrderedDict()
+        self._lock = Lock()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> T | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: T) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def memoize[**P, T](
+    maxsize: int = 32,
+) -> Callable[[Callable[P, T]], Callable[P, T]]:
+    '''
+    Memoize a function whose first argument is a fingerprinted graph.
+
+    The remaining arguments are part of the key, so they should be
+    hashable, dataframes or (nested) lists, tuples and dicts of them.
+    '''
+
+    def decorator(func: Callable[P, T]) -> Callable[P, T]:
+        cache: FingerprintCache[T] = FingerprintCache(maxsize=maxsize)
+
+        @wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            graph: Fingerprinted = args[0]  # type: ignore
+            key = (
+                graph.fingerprint(),
+                _key_of(args[1:]),
+                _key_of(kwargs),
+            )
+
+            value = cache.get(key)
+            if value is None:
+                value = func(*args, **kwargs)
+                if value is not None:
+                    cache.put(key, value)
+            return value
+
+        wrapper.cache = cache  # type: ignore
+        return wrapper
+
+    return decorator
+
+
+def _key_of(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted(
+            (key, _key_of(item))
+            for key, item in value.items()
+        ))
+    if isinstance(value, (list, tuple)):
+        return tuple(_key_of(item) for item in value)
+    if isinstance(value, pl.DataFrame):
+        # NOTE: Frames are unhashable, so key them by their contents
+        return (
+            repr(value.schema),
+            value.hash_rows(seed=0).to_numpy().tobytes(),
+        )
+    return value
@@ -0,0 +1,191 @@
+from enum import Enum
+
+import numpy as np
+import polars as pl
+from kubegraph.data.adjacency import NetworkGraphAdjacency
+
+
+class NetworkGraphCoarsening(Enum):
+    Attribute = 'attribute'
+    Component = 'component'
+    LabelPropagation = 'label_propagation'
+
+    @classmethod
+    def default(cls) -> 'NetworkGraphCoarsening':
+        return cls.LabelPropagation
+
+
+def assign_clusters(
+    adjacency: NetworkGraphAdjacency,
+    nodes: pl.DataFrame,
+    method: NetworkGraphCoarsening,
+    key: str | None = None,
+    max_clusters: int | None = None,
+    components: np.ndarray | None = None,
+) -> pl.DataFrame:
+    '''
+    Assign every node of the adjacency into a named cluster.
+
+    The component coarsening takes the weakly connected `components` of
+    the adjacency (see `NetworkGraphStatistics`).
+
+    When there are more than `max_clusters` clusters, the ones smaller than
+    an even share of the nodes are packed into `(others)` clusters of about
+    the same size each.
+    '''
+    match method:
+        case NetworkGraphCoarsening.Attribute:
+            if key is None:
+                raise ValueError('Attribute coarsening requires a key')
+            clusters = adjacency.names.to_frame().join(
+                nodes.select('name', pl.col(key).cast(pl.String)),
+                on='name',
+                how='left',
+                maintain_order='left',
+            ).get_column(key).fill_null('(unknown)')
+        case NetworkGraphCoarsening.Component:
+            if components is None:
+                raise ValueError('Component coarsening requires components')
+            clusters = adjacency.names.gather(_representatives(components))
+        case NetworkGraphCoarsening.LabelPropagation:
+            labels = _propagate_labels(adjacency)
+            clusters = adjacency.names.gather(labels)
+
+    clusters = clusters.alias('cluster')
+    if max_clusters is not None:
+        clusters = _pack_small_clusters(clusters, max_clusters)
+
+    return pl.DataFrame([adjacency.names, clusters])
+
+
+def aggregate_clusters(
+    edges: pl.DataFrame,
+    nodes: pl.DataFrame,
+    clusters: pl.DataFrame,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    '''
+    Collapse the clustered nodes and aggregate the edges between clusters.
+
+    Coordinates, costs and distances are averaged, and the other numeric
+    attributes (e.g. capacity and traffic) are summed. Intra-cluster edges
+    are dropped.
+    '''
+    def aggregations(
+        df: pl.DataFrame,
+        means: tuple[str, ...],
+    ) -> list[pl.Expr]:
+        return [
+            pl.col(column).mean()
+            if column in means
+            else pl.col(column).sum()
+            for column, dtype in df.schema.items()
+            if dtype.is_numeric()
+        ]
+
+    cluster_nodes = nodes \
+        .join(clusters, on='name', how='inner') \
+        .group_by('cluster', maintain_order=True) \
+        .agg(
+            pl.len().alias('size'),
+            *aggregations(nodes, means=('latitude', 'longitude')),
+        ) \
+        .rename({'cluster': 'name'})
+
+    mapping = clusters.rename({'name': 'node'})
+    cluster_edges = edges \
+        .join(
+            mapping.rename({'cluster': '__start'}),
+            left_on='start',
+            right_on='node',
+            how='inner',
+        ) \
+        .join(
+            mapping.rename({'cluster': '__end'}),
+            left_on='end',
+            right_on='node',
+            how='inner',
+        ) \
+        .filter(pl.col('__start') != pl.col('__end')) \
+        .group_by('__start', '__end', maintain_order=True) \
+        .agg(*aggregations(edges, means=('cost', 'distance'))) \
+        .rename({'__start': 'start', '__end': 'end'})
+
+    return cluster_edges, cluster_nodes
+
+
+def _pack_small_clusters(
+    clusters: pl.Series,
+    max_clusters: int,
+) -> pl.Series:
+    sizes = clusters.value_counts() \
+        .sort(['count', 'cluster'], descending=[True, False])
+    if sizes.height <= max_clusters:
+        return clusters
+
+    # NOTE: Keep the clusters holding at least an even share of the nodes;
+    # there are fewer than `max_clusters` of them, as some are left over.
+    kept = sizes.filter(pl.col('count') * max_clusters >= clusters.len())
+    small = sizes.slice(kept.height)
+    num_buckets = max_clusters - kept.height
+
+    # NOTE: Cut the (whole) small clusters into buckets by their running
+    # total, so that no bucket exceeds its share by more than one cluster.
+    total = small.get_column('count').sum()
+    buckets = small.select(
+        'cluster',
+        bucket=(
+            (pl.col('count').cum_sum() - pl.col('count'))
+            * num_buckets // total
+        ).rank('dense'),
+    )
+    names = buckets.get_column('bucket').cast(pl.String)
+    if names.n_unique() == 1:
+        names = pl.Series(['(others)'] * names.len())
+    else:
+        names = '(others #' + names + ')'
+
+    return clusters.replace(buckets.get_column('cluster'), names)
+
+
+def _propagate_labels(
+    adjacency: NetworkGraphAdjacency,
+    max_iter: int = 16,
+) -> np.ndarray:
+    num_nodes = adjacency.num_nodes
+
+    # NOTE: Undirected neighbourhoods, plus a self loop to damp oscillation
+    nodes = np.arange(num_nodes)
+    src = np.concatenate([adjacency.start_ids, adjacency.end_ids, nodes])
+    dst = np.concatenate([adjacency.end_ids, adjacency.start_ids, nodes])
+
+    labels = nodes.copy()
+    for _ in range(max_iter):
+        # Count the neighbour labels of every node
+        pairs, counts = np.unique(
+            src * num_nodes + labels[dst],
+            return_counts=True,
+        )
+        owners = pairs // num_nodes
+        candidates = pairs % num_nodes
+
+        # Pick the most frequent label (the smallest on ties)
+        order = np.lexsort((candidates, -counts, owners))
+        first = np.ones(order.size, dtype=bool)
+        first[1:] = owners[order][1:] != owners[order][:-1]
+
+        updated = labels.copy()
+        updated[owners[order][first]] = candidates[order][first]
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+    return _representatives(labels)
+
+
+def _representatives(labels: np.ndarray) -> np.ndarray:
+    # NOTE: Name each cluster after its first member
+    _, first, inverse = np.unique(
+        labels,
+        return_index=True,
+        return_inverse=True,
+    )
+    return first[inverse]
@@ -3,7 +3,7 @@ from typing import override
 
 from pydantic.dataclasses import dataclass
 
-from kubegraph.data.graph import NetworkGraph
+from kubegraph.data.graph import LazyNetworkGraph, NetworkGraph
 
 
 @dataclass(eq=True, frozen=True)
@@ -32,3 +32,13 @@ class BaseNetworkGraphDB(metaclass=ABCMeta):
         namespace: str | None = None,
     ) -> NetworkGraph:
         pass
+
+    def scan(
+        self,
+        kind: str,
+        namespace: str | None = None,
+    ) -> LazyNetworkGraph:
+        return self.load(
+            kind=kind,
+            namespace=namespace,
+        ).lazy()
@@ -0,0 +1,407 @@
+from datetime import date, datetime, timedelta, timezone
+import glob
+import os
+import re
+from typing import Literal, TYPE_CHECKING
+from urllib.parse import quote
+import uuid
+
+import polars as pl
+from pydantic import BaseModel, Field, PrivateAttr
+
+if TYPE_CHECKING:
+    from kubegraph.data.series import NetworkGraphSeries
+
+_PARTITIONS = {
+    'kind': pl.String,
+    'namespace': pl.String,
+    'day': pl.Date,
+}
+_TIMESTAMP = pl.Datetime('us', 'UTC')
+
+_KEYS = {
+    'edges': ['start', 'end'],
+    'nodes': ['name'],
+}
+_UNITS = {
+    'us': timedelta(microseconds=1),
+    'ms': timedelta(milliseconds=1),
+    's': timedelta(seconds=1),
+    'm': timedelta(minutes=1),
+    'h': timedelta(hours=1),
+    'd': timedelta(days=1),
+    'w': timedelta(weeks=1),
+}
+
+
+class LocalNetworkGraphHistory(BaseModel):
+    '''
+    An append-only store of the snapshots of graph series, on local disk.
+
+    Every append writes the edges and the nodes, along with their
+    `timestamp` (in UTC), as new parquet files under hive partitions:
+    `{table}/kind=.../namespace=.../day=.../part-*.parquet`. The scans
+    filter on the partition columns first, so that a time range only
+    opens the files of its days; `compact` merges the files of past days,
+    written one per step.
+
+    Every append also rolls the new rows up into the `rollups` tiers
+    (`rollups/{every}/{table}/...`): the count, the sum, the min and the
+    max of every numeric column, per key and bucket. The partial buckets
+    of the appends are merged when they are scanned (or compacted), so
+    that an append costs a pass over its own rows only. A scan with a
+    resolution (`every`) reads the coarsest tier that divides it.
+
+    The columns may differ between the appends: a scan reads the schemas
+    of the files of its kind (and namespace) once, and unifies them, so
+    the columns missing from the older files are null.
+    '''
+
+    base_dir: str = './outputs/history/'
+    rollups: list[str] = Field(
+        default_factory=lambda: ['1m', '15m', '1h', '1d'],
+    )
+
+    # NOTE: The files are never rewritten, so their schemas are cached
+    _schemas: dict[str, pl.Schema] = PrivateAttr(default_factory=dict)
+
+    def append(
+        self,
+        kind: str,
+        namespace: str,
+        series: 'NetworkGraphSeries',
+    ) -> None:
+        timestamp = pl.lit(series.timestamp).alias('timestamp')
+        self.append_frames(
+            kind=kind,
+            namespace=namespace,
+            edges=series.edges.with_columns(timestamp),
+            nodes=series.nodes.with_columns(timestamp),
+        )
+
+    def append_frames(
+        self,
+        kind: str,
+        namespace: str,
+        edges: pl.DataFrame,
+        nodes: pl.DataFrame,
+    ) -> None:
+        '''
+        Append the stacked frames of many steps (e.g. of
+        `NetworkGraphSeries.simulate`), with a `timestamp` column each.
+        '''
+        for table, df in (('edges', edges), ('nodes', nodes)):
+            reserved = set(_PARTITIONS).intersection(df.columns)
+            if reserved:
+                raise ValueError(f'Reserved history columns: {reserved}')
+
+            df = df.with_columns(_to_utc(df.schema['timestamp']))
+            self._write(table, kind, namespace, df)
+            for every in self.rollups:
+                self._write(
+                    f'rollups/{every}/{table}',
+                    kind,
+                    namespace,
+                    _roll_up(df, _KEYS[table], every),
+                )
+
+    def scan(
+        self,
+        kind: str,
+        namespace: str | None = None,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+        every: str | None = None,
+    ) -> tuple[pl.LazyFrame, pl.LazyFrame]:
+        '''
+        Scan the edges and the nodes appended within `[start, end)`.
+
+        With a resolution (`every`, a polars duration), scan the `min`,
+        `max`, `mean` and `sum` of every numeric column per key and
+        bucket instead (e.g. `traffic_max`), from the coarsest tier that
+        divides it. The tiers only tell their whole buckets apart, so the
+        bounds are best aligned to `every`.
+        '''
+        predicates = []
+        days = [None, None]
+        if start is not None:
+            start = _parse_utc(start)
+            days[0] = start.date()
+            predicates.append(pl.col('day') >= start.date())
+            predicates.append(pl.col('timestamp') >= start)
+        if end is not None:
+            end = _parse_utc(end)
+            days[1] = end.date()
+            predicates.append(pl.col('day') <= end.date())
+            predicates.append(pl.col('timestamp') < end)
+
+        def scan_table(table: str) -> pl.LazyFrame:
+            df = self._scan(table, kind, namespace, *days)
+            return df.filter(*predicates) if predicates else df
+
+        if every is None:
+            return scan_table('edges'), scan_table('nodes')
+
+        tier = self.rollup_for(every)
+
+        def scan(table: Literal['edges', 'nodes']) -> pl.LazyFrame:
+            keys = ['kind', 'namespace', *_KEYS[table]]
+            if tier is None:
+                df = _roll_up(scan_table(table), keys, every)
+            else:
+                df = _merge(scan_table(f'rollups/{tier}/{table}'), keys, every)
+            return _finish(df, keys)
+
+        return scan('edges'), scan('nodes')
+
+    def rollup_for(self, every: str) -> str | None:
+        '''
+        Return the coarsest rollup tier whose buckets divide the buckets of
+        `every`, if any.
+        '''
+        target = _to_timedelta(every)
+        tiers = [
+            (length, tier)
+            for tier in self.rollups
+            if (length := _to_timedelta(tier)) is not None
+            # NOTE: The calendar units are made of whole days
+            and (
+                target % length == timedelta()
+                if target is not None
+                else timedelta(days=1) % length == timedelta()
+            )
+        ]
+        return max(tiers)[1] if tiers else None
+
+    def compact(
+        self,
+        kind: str,
+        namespace: str,
+        before: date | None = None,
+    ) -> int:
+        '''
+        Merge the files of every day (before `before`, if given) into one,
+        and return the number of the merged partitions.
+
+        The merged files replace the parts only after they are written, so
+        the concurrent scans may briefly see the rows of a day twice; the
+        scans planned before are stale, as they list their files upfront.
+        '''
+        tables = [
+            (table, f'{prefix}{table}', every)
+            for prefix, every in [
+                ('', None),
+                *((f'rollups/{every}/', every) for every in self.rollups),
+            ]
+            for table in ('edges', 'nodes')
+        ]
+
+        num_compacted = 0
+        for table, path, every in tables:
+            pattern = self._partition_dir(path, kind, namespace, '*')
+            for directory in sorted(glob.glob(pattern)):
+                day = date.fromisoformat(directory.rsplit('=', 1)[-1])
+                if before is not None and day >= before:
+                    continue
+                parts = sorted(glob.glob(f'{directory}/*.parquet'))
+                if len(parts) < 2:
+                    continue
+
+                df = pl.concat(
+                    [pl.read_parquet(part) for part in parts],
+                    how='diagonal_relaxed',
+                )
+                if every is not None:
+                    df = _merge(df.lazy(), _KEYS[table], every).collect()
+                _write_atomic(
+                    df=df.sort('timestamp', maintain_order=True),
+                    path=f'{directory}/part-{uuid.uuid4().hex}.parquet',
+                )
+                for part in parts:
+                    os.remove(part)
+                    self._schemas.pop(part, None)
+                num_compacted += 1
+        return num_compacted
+
+    def _partition_dir(
+        self,
+        table: str,
+        kind: str,
+        namespace: str,
+        day: date | str,
+    ) -> str:
+        return f'{self.base_dir}/{table}' \
+            f'/kind={quote(kind, safe='')}' \
+            f'/namespace={quote(namespace, safe='')}' \
+            f'/day={day}'
+
+    def _scan(
+        self,
+        table: str,
+        kind: str,
+        namespace: str | None = None,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> pl.LazyFrame:
+        # NOTE: The partition values are quoted, so they never match a glob
+        namespace = quote(namespace, safe='') if namespace is not None else '*'
+        pattern = f'{self.base_dir}/{table}/kind={quote(kind, safe='')}' \
+            f'/namespace={namespace}/day=*'
+        parts = [
+            part
+            for part in sorted(glob.glob(f'{pattern}/*.parquet'))
+            if _within(part, start, end)
+        ]
+        if not parts:
+            return pl.LazyFrame(schema={
+                'timestamp': _TIMESTAMP,
+                **dict.fromkeys(_KEYS[table.rsplit('/', 1)[-1]], pl.String),
+                **_PARTITIONS,
+            })
+
+        # NOTE: The columns added later are null in the older files, and
+        # the columns are cast to the supertype of their files; they are
+        # ordered as they were appended
+        for part in parts:
+            if part not in self._schemas:
+                self._schemas[part] = pl.read_parquet_schema(part)
+        schema = pl.concat(
+            [
+                pl.DataFrame(schema=self._schemas[part])
+                for part in sorted(parts, key=os.path.getmtime)
+            ],
+            how='diagonal_relaxed',
+        ).schema
+        return pl.scan_parquet(
+            parts,
+            schema=schema,
+            hive_partitioning=True,
+            hive_schema=_PARTITIONS,
+            missing_columns='insert',
+            cast_options=pl.ScanCastOptions(
+                integer_cast=['upcast', 'allow-float'],
+                float_cast='upcast',
+            ),
+        )
+
+    def _write(
+        self,
+        table: str,
+        kind: str,
+        namespace: str,
+        df: pl.DataFrame,
+    ) -> None:
+        for (day,), part in df.with_columns(
+            day=pl.col('timestamp').dt.date(),
+        ).partition_by('day', as_dict=True, include_key=False).items():
+            directory = self._partition_dir(table, kind, namespace, day)
+            os.makedirs(directory, exist_ok=True)
+            _write_atomic(
+                df=part.sort('timestamp', maintain_order=True),
+                path=f'{directory}/part-{uuid.uuid4().hex}.parquet',
+            )
+
+
+def _roll_up[T: (pl.DataFrame, pl.LazyFrame)](
+    df: T,
+    keys: list[str],
+    every: str,
+) -> T:
+    metrics = [
+        column
+        for column, dtype in df.collect_schema().items()
+        if dtype.is_numeric() and column not in keys and column != 'step'
+    ]
+    return df \
+        .group_by(pl.col('timestamp').dt.truncate(every), *keys) \
+        .agg(
+            pl.col(metrics).count().name.suffix('_count'),
+            pl.col(metrics).sum().name.suffix('_sum'),
+            pl.col(metrics).min().name.suffix('_min'),
+            pl.col(metrics).max().name.suffix('_max'),
+        )
+
+
+def _merge(df: pl.LazyFrame, keys: list[str], every: str) -> pl.LazyFrame:
+    def columns(aggregation: str) -> list[str]:
+        return [
+            column
+            for column in df.collect_schema().names()
+            if column.endswith(f'_{aggregation}')
+        ]
+
+    return df \
+        .group_by(pl.col('timestamp').dt.truncate(every), *keys) \
+        .agg(
+            pl.col(columns('count')).sum(),
+            pl.col(columns('sum')).sum(),
+            pl.col(columns('min')).min(),
+            pl.col(columns('max')).max(),
+        )
+
+
+def _finish(df: pl.LazyFrame, keys: list[str]) -> pl.LazyFrame:
+    metrics = [
+        column.removesuffix('_count')
+        for column in df.collect_schema().names()
+        if column.endswith('_count')
+    ]
+    return df \
+        .select(
+            'timestamp',
+            *keys,
+            *(
+                expr
+                for metric in metrics
+                for expr in (
+                    pl.col(f'{metric}_min'),
+                    pl.col(f'{metric}_max'),
+                    # NOTE: The buckets appended before the metric have no
+                    # values, so their mean is null rather than NaN
+                    pl.when(pl.col(f'{metric}_count') > 0)
+                    .then(pl.col(f'{metric}_sum') / pl.col(f'{metric}_count'))
+                    .alias(f'{metric}_mean'),
+                    pl.col(f'{metric}_sum'),
+                )
+            ),
+        ) \
+        .sort('timestamp', *keys)
+
+
+def _to_timedelta(duration: str) -> timedelta | None:
+    # NOTE: The calendar units (e.g. `mo`) have no fixed length
+    length = timedelta()
+    for value, unit in re.findall(r'(\d+)([a-z]+)', duration):
+        if unit not in _UNITS:
+            return None
+        length += int(value) * _UNITS[unit]
+    return length
+
+
+def _to_utc(dtype: pl.DataType) -> pl.Expr:
+    # NOTE: Naive timestamps are taken as UTC
+    timestamp = pl.col('timestamp')
+    if dtype == pl.String:
+        timestamp = timestamp.str.to_datetime(time_unit='us', time_zone='UTC')
+    elif isinstance(dtype, pl.Datetime) and dtype.time_zone is None:
+        timestamp = timestamp.dt.replace_time_zone('UTC')
+    return timestamp.dt.convert_time_zone('UTC').cast(_TIMESTAMP)
+
+
+def _parse_utc(value: datetime | str) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _within(part: str, start: date | None, end: date | None) -> bool:
+    day = date.fromisoformat(os.path.dirname(part).rsplit('=', 1)[-1])
+    return (start is None or day >= start) and (end is None or day <= end)
+
+
+def _write_atomic(df: pl.DataFrame, path: str) -> None:
+    # NOTE: The scans never match the unfinished `*.tmp` files
+    df.write_parquet(f'{path}.tmp')
+    os.replace(f'{path}.tmp', path)
@@ -2,15 +2,15 @@ import glob
 import os
 from typing import override
 
-import polars as pl
 from pydantic import BaseModel
 
 from kubegraph.data.db.base import BaseNetworkGraphDB, NetworkGraphRef
-from kubegraph.data.graph import NetworkGraph
+from kubegraph.data.graph import LazyNetworkGraph, NetworkGraph
 
 
 class LocalNetworkGraphDB(BaseModel, BaseNetworkGraphDB):
     base_dir: str = './templates/db/'
+    cost_per_km: float | None = 1.0
 
     @override
     def list(
@@ -38,10 +38,28 @@ class LocalNetworkGraphDB(BaseModel, BaseNetworkGraphDB):
         kind: str,
         namespace: str | None = None,
     ) -> NetworkGraph:
-        return NetworkGraph(
+        return self.scan(
+            kind=kind,
+            namespace=namespace,
+        ).collect()
+
+    @override
+    def scan(
+        self,
+        kind: str,
+        namespace: str | None = None,
+    ) -> LazyNetworkGraph:
+        graph = LazyNetworkGraph.scan(
             # Define the directed graph for the flow.
-            edges=pl.read_csv(f'{self.base_dir}/{kind}_{namespace}/edges.csv'),
+            edges=f'{self.base_dir}/{kind}_{namespace}/edges.csv',
 
             # Define an array of supplies at each node.
-            nodes=pl.read_csv(f'{self.base_dir}/{kind}_{namespace}/nodes.csv'),
+            nodes=f'{self.base_dir}/{kind}_{namespace}/nodes.csv',
         )
+
+        # NOTE: Derive the missing edge costs from the node coordinates
+        if graph.is_geolocational():
+            graph = graph.with_edge_distances(
+                cost_per_km=self.cost_per_km,
+            )
+        return graph
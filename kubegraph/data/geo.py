@@ -0,0 +1,129 @@
+import polars as pl
+
+from kubegraph.data.spatial import EARTH_RADIUS_KM, NetworkGraphSpatialIndex
+
+
+def haversine(
+    latitude_a: pl.Expr,
+    longitude_a: pl.Expr,
+    latitude_b: pl.Expr,
+    longitude_b: pl.Expr,
+) -> pl.Expr:
+    '''
+    Compute the great-circle distance (in km) between the coordinates (in
+    degrees).
+    '''
+    phi_a = latitude_a.radians()
+    phi_b = latitude_b.radians()
+    a = ((phi_b - phi_a) / 2).sin().pow(2) \
+        + phi_a.cos() * phi_b.cos() \
+        * ((longitude_b.radians() - longitude_a.radians()) / 2).sin().pow(2)
+    return 2 * EARTH_RADIUS_KM * a.sqrt().clip(upper_bound=1).arcsin()
+
+
+def with_edge_distances(
+    edges: pl.LazyFrame,
+    nodes: pl.LazyFrame,
+    cost_per_km: float | None = None,
+) -> pl.LazyFrame:
+    '''
+    Derive the `distance` (in km) of every edge from the coordinates of its
+    endpoints.
+
+    When `cost_per_km` is given, the missing (or null) `cost`s are derived
+    from the distances as well; the given costs are kept as-is.
+    '''
+    locations = nodes.select('name', 'latitude', 'longitude')
+    edges = edges \
+        .join(
+            locations.rename({
+                'latitude': '__start_latitude',
+                'longitude': '__start_longitude',
+            }),
+            left_on='start',
+            right_on='name',
+            how='left',
+            maintain_order='left',
+        ) \
+        .join(
+            locations.rename({
+                'latitude': '__end_latitude',
+                'longitude': '__end_longitude',
+            }),
+            left_on='end',
+            right_on='name',
+            how='left',
+            maintain_order='left',
+        ) \
+        .with_columns(
+            distance=haversine(
+                pl.col('__start_latitude'),
+                pl.col('__start_longitude'),
+                pl.col('__end_latitude'),
+                pl.col('__end_longitude'),
+            ),
+        ) \
+        .drop(
+            '__start_latitude',
+            '__start_longitude',
+            '__end_latitude',
+            '__end_longitude',
+        )
+
+    if cost_per_km is None:
+        return edges
+    cost = _cost_of(cost_per_km)
+    if 'cost' in edges.collect_schema():
+        cost = pl.coalesce(
+            pl.col('cost'),
+            cost.cast(edges.collect_schema()['cost']),
+        )
+    return edges.with_columns(cost=cost)
+
+
+def candidate_edges(
+    index: NetworkGraphSpatialIndex,
+    radius: float,
+    capacity: int,
+    cost_per_km: float | None = None,
+) -> pl.DataFrame:
+    '''
+    Generate the edges between every pair of nodes within `radius` km, in
+    both directions.
+    '''
+    i, j = index.pairs_within(radius)
+    edges = pl.DataFrame({
+        'start': index.names.gather(i),
+        'end': index.names.gather(j),
+        'start_latitude': index.latitudes[i],
+        'start_longitude': index.longitudes[i],
+        'end_latitude': index.latitudes[j],
+        'end_longitude': index.longitudes[j],
+    }).select(
+        'start',
+        'end',
+        capacity=pl.lit(capacity, dtype=pl.Int64),
+        distance=haversine(
+            pl.col('start_latitude'),
+            pl.col('start_longitude'),
+            pl.col('end_latitude'),
+            pl.col('end_longitude'),
+        ),
+    )
+    edges = pl.concat([
+        edges,
+        edges.select(
+            start='end',
+            end='start',
+            capacity='capacity',
+            distance='distance',
+        ),
+    ])
+    if cost_per_km is not None:
+        edges = edges.with_columns(cost=_cost_of(cost_per_km))
+    return edges
+
+
+def _cost_of(cost_per_km: float) -> pl.Expr:
+    # NOTE: The solver only accepts integral costs
+    return (pl.col('distance') * cost_per_km).round().cast(pl.Int64)
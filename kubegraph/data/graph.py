@@ -1,23 +1,42 @@
 from enum import Enum
+import hashlib
 from io import BytesIO
-import json
 import os
 from pathlib import Path
-from tarfile import TarFile, TarInfo
-from typing import IO, Any, Self, override
+from typing import IO, Any, Iterable, Iterator, Self, override
 import uuid
 
 import graphviz
+import numpy as np
 import polars as pl
-from pydantic import BaseModel
-import pyvis
+from pydantic import BaseModel, Field
 import matplotlib
 import matplotlib.figure
+from matplotlib.collections import LineCollection
 import matplotlib.pyplot as plt
 import networkx as nx
 import streamlit as st
 from streamlit.runtime import exists as _is_streamlit_running
 
+from kubegraph.data.adjacency import NetworkGraphAdjacency
+from kubegraph.data.archive import (
+    NetworkGraphArchiveCompression,
+    NetworkGraphArchiveFormat,
+    NetworkGraphArchiveReader,
+    NetworkGraphArchiveWriter,
+)
+from kubegraph.data.cache import memoize
+from kubegraph.data.coarsen import (
+    NetworkGraphCoarsening,
+    aggregate_clusters,
+    assign_clusters,
+)
+from kubegraph.data.geo import candidate_edges, with_edge_distances
+from kubegraph.data.layout import NetworkGraphLayout, compute_layout
+from kubegraph.data.spatial import NetworkGraphSpatialIndex
+from kubegraph.data.stats import NetworkGraphStatistics, NetworkGraphSummary
+from kubegraph.render.vis import render_vis_html
+
 # Load environment variables
 _HAS_DISPLAY = 'DISPLAY' in os.environ
 _IS_STREAMLIT_RUNNING = _is_streamlit_running()
@@ -28,6 +47,19 @@ if _HAS_DISPLAY:
     matplotlib.use(os.environ.get('MPLBACKEND', 'GTK3Agg'))
 
 
+_MAX_LABELS = 256
+
+# NOTE: About 0.2 s cold; see `benches/kubegraph_data_graph_layout.py`
+_MAX_FORCE_DIRECTED_EDGES = 5_000
+
+# NOTE: Agg rasterizes only about 40k hairlines per second, and more of them
+# just saturate the figure; see `benches/kubegraph_data_graph_draw.py`
+_MAX_DRAWN_EDGES = 10_000
+
+_DOT_KEYWORDS = ['node', 'edge', 'graph', 'digraph', 'subgraph', 'strict']
+_STOP_WORDS = ['__START__', '__END__']
+
+
 class NetworkGraphDrawBackend(Enum):
     Matplotlib = 'matplotlib'
     Pyvis = 'pyvis'
@@ -38,80 +70,340 @@ class NetworkGraphDrawBackend(Enum):
 
 
 class NetworkGraph(BaseModel, arbitrary_types_allowed=True):
-    id: uuid.UUID = uuid.uuid4()
+    id: uuid.UUID = Field(default_factory=uuid.uuid4)
     edges: pl.DataFrame
     nodes: pl.DataFrame
 
-    def __eq__(self, other: Self) -> bool:
-        return self.id == other.id
+    _fingerprint: str | None = None
+
+    @override
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, NetworkGraph):
+            return NotImplemented
+        return self.fingerprint() == other.fingerprint()
 
+    @override
     def __hash__(self) -> int:
-        return hash(self.id)
+        return hash(self.fingerprint())
+
+    @override
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+
+        # Invalidate the fingerprint whenever the content is replaced
+        if not name.startswith('_'):
+            self._fingerprint = None
+
+    @override
+    def model_copy(
+        self,
+        *,
+        update: dict[str, Any] | None = None,
+        deep: bool = False,
+    ) -> Self:
+        this = super().model_copy(update=update, deep=deep)
+        if update:
+            this._fingerprint = None
+        return this
+
+    def fingerprint(self) -> str:
+        '''
+        Return a content-addressed fingerprint of this graph.
+
+        The fingerprint is derived from the schemas and the row hashes of
+        the `nodes`/`edges` frames, plus any scalar fields of subclasses.
+        It is computed once and stored until the content is replaced.
+        '''
+        if self._fingerprint is None:
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update(type(self).__name__.encode('utf-8'))
+            hasher.update(
+                self.model_dump_json(exclude={'id', 'edges', 'nodes'})
+                .encode('utf-8'),
+            )
+            _hash_dataframe(hasher, self.edges)
+            _hash_dataframe(hasher, self.nodes)
+            self._fingerprint = hasher.hexdigest()
+        return self._fingerprint
 
     @classmethod
     def load(
         cls,
         fileobj: str | Path | IO[bytes],
+        columns: Iterable[str] | None = None,
+        node_filter: pl.Expr | None = None,
+        edge_filter: pl.Expr | None = None,
     ) -> Self:
-        archive = TarFile(
-            fileobj=fileobj,  # type: ignore
-            mode='r',
-        )
-        this = cls(
-            edges=_load_dataframe(
-                archive=archive,
-                name='edges',
-            ),
-            nodes=_load_dataframe(
-                archive=archive,
-                name='nodes',
-            ),
-        )
-        archive.close()
+        '''
+        Load a graph archive.
+
+        Only the given `columns` (of either frame) are decoded, along with
+        the identity columns (`name`, `start`, `end`). The filters are
+        pushed down into the scans, so the parquet row groups whose
+        statistics do not match them are skipped.
+        '''
+        with NetworkGraphArchiveReader(fileobj, columns) as archive:
+            return cls._load_from(
+                archive,
+                node_filter=node_filter,
+                edge_filter=edge_filter,
+            )
 
-        return this
+    @classmethod
+    def _load_from(
+        cls,
+        archive: NetworkGraphArchiveReader,
+        node_filter: pl.Expr | None = None,
+        edge_filter: pl.Expr | None = None,
+        **kwargs: Any,
+    ) -> Self:
+        return cls(
+            edges=archive.read_dataframe('edges', edge_filter),
+            nodes=archive.read_dataframe('nodes', node_filter),
+            **kwargs,
+        )
 
     def dump(
         self,
         fileobj: str | Path | IO[bytes],
+        format: NetworkGraphArchiveFormat | str | None = None,
+        compression: NetworkGraphArchiveCompression | None = None,
+        compression_level: int | None = None,
     ) -> None:
-        archive = TarFile(
-            fileobj=fileobj,  # type: ignore
-            mode='w',
+        with NetworkGraphArchiveWriter(
+            fileobj,
+            format,
+            compression=compression,
+            compression_level=compression_level,
+        ) as archive:
+            self._dump_to(archive)
+
+    def iter_dump(
+        self,
+        format: NetworkGraphArchiveFormat | str | None = None,
+        compression: NetworkGraphArchiveCompression | None = None,
+        compression_level: int | None = None,
+        chunk_size: int = 1 << 20,
+    ) -> Iterator[bytes]:
+        archive = NetworkGraphArchiveWriter(
+            format=format,
+            compression=compression,
+            compression_level=compression_level,
+            chunk_size=chunk_size,
         )
         self._dump_to(archive)
-        archive.close()
+        return iter(archive)
 
     def _dump_to(
         self,
-        archive: TarFile,
+        archive: NetworkGraphArchiveWriter,
     ) -> None:
-        _dump_dataframe(
-            archive=archive,
-            name='edges',
-            df=self.edges,
-        )
-        _dump_dataframe(
-            archive=archive,
-            name='nodes',
-            df=self.nodes,
-        )
+        archive.write_dataframe('edges', self.edges)
+        archive.write_dataframe('nodes', self.nodes)
 
-    def dumps(self) -> BytesIO:
+    def dumps(
+        self,
+        format: NetworkGraphArchiveFormat | str | None = None,
+        compression: NetworkGraphArchiveCompression | None = None,
+        compression_level: int | None = None,
+    ) -> BytesIO:
         buffer = BytesIO()
-        self.dump(buffer)
+        self.dump(buffer, format, compression, compression_level)
+        buffer.seek(0)
         return buffer
 
     def is_geolocational(self) -> bool:
         return 'latitude' in self.nodes.columns \
             and 'longitude' in self.nodes.columns
 
+    @memoize()
+    def adjacency(self) -> NetworkGraphAdjacency:
+        return NetworkGraphAdjacency.from_frames(
+            edges=self.edges,
+            nodes=self.nodes,
+        )
+
+    @memoize()
+    def statistics(self) -> NetworkGraphStatistics:
+        return NetworkGraphStatistics.from_frames(
+            edges=self.edges,
+            adjacency=self.adjacency(),
+        )
+
+    @memoize()
+    def summary(self) -> NetworkGraphSummary:
+        return NetworkGraphSummary.from_frames(
+            edges=self.edges,
+            nodes=self.nodes,
+            statistics=self.statistics(),
+        )
+
+    @memoize()
+    def spatial_index(self) -> NetworkGraphSpatialIndex:
+        if not self.is_geolocational():
+            raise ValueError('The graph has no node coordinates')
+        return NetworkGraphSpatialIndex.from_frame(
+            nodes=self.nodes.filter(~pl.col('name').is_in(_STOP_WORDS)),
+        )
+
+    def with_edge_distances(
+        self,
+        cost_per_km: float | None = None,
+    ) -> Self:
+        '''
+        Derive the edge `distance`s (in km) from the node coordinates; see
+        `kubegraph.data.geo.with_edge_distances`.
+        '''
+        return self.model_copy(update={
+            'edges': with_edge_distances(
+                edges=self.edges.lazy(),
+                nodes=self.nodes.lazy(),
+                cost_per_km=cost_per_km,
+            ).collect(),
+        })
+
+    def with_candidate_edges(
+        self,
+        radius: float,
+        capacity: int,
+        cost_per_km: float | None = None,
+    ) -> Self:
+        '''
+        Add the edges between every pair of nodes within `radius` km that
+        are not connected yet.
+        '''
+        candidates = candidate_edges(
+            index=self.spatial_index(),
+            radius=radius,
+            capacity=capacity,
+            cost_per_km=cost_per_km,
+        ).join(
+            self.edges.select('start', 'end'),
+            on=['start', 'end'],
+            how='anti',
+        )
+        return self.model_copy(update={
+            'edges': pl.concat(
+                [self.edges, candidates],
+                how='diagonal_relaxed',
+            ),
+        })
+
+    @memoize()
+    def layout(
+        self,
+        method: NetworkGraphLayout | str | None = None,
+        initial: pl.DataFrame | None = None,
+        iterations: int | None = None,
+    ) -> pl.DataFrame:
+        '''
+        Return the node positions (`name`, `x`, `y`), in the adjacency node
+        order.
+
+        Pass the layout of a previous snapshot as `initial` to warm-start
+        the force-directed layout, so that the nodes stay in place.
+
+        By default, the graphs with more than `_MAX_FORCE_DIRECTED_EDGES`
+        edges are laid out in a circle, unless they are warm-started.
+        '''
+        if method is None:
+            method = NetworkGraphLayout.default() \
+                if initial is not None \
+                or self.edges.height <= _MAX_FORCE_DIRECTED_EDGES \
+                else NetworkGraphLayout.Circular
+        elif isinstance(method, str):
+            method = NetworkGraphLayout(method)
+
+        adjacency = self.adjacency()
+        return compute_layout(
+            adjacency=adjacency,
+            method=method,
+            initial=initial,
+            hidden=adjacency.names.is_in(_STOP_WORDS).to_numpy(),
+            iterations=iterations,
+        )
+
+    @memoize()
+    def clusters(
+        self,
+        method: NetworkGraphCoarsening | str | None = None,
+        key: str | None = None,
+        max_clusters: int | None = None,
+    ) -> pl.DataFrame:
+        if method is None:
+            method = NetworkGraphCoarsening.default()
+        elif isinstance(method, str):
+            method = NetworkGraphCoarsening(method)
+
+        # NOTE: The special nodes are connected to every node
+        graph = self.subgraph(
+            self.nodes.get_column('name').filter(
+                ~self.nodes.get_column('name').is_in(_STOP_WORDS),
+            ),
+        )
+        return assign_clusters(
+            adjacency=graph.adjacency(),
+            nodes=graph.nodes,
+            method=method,
+            components=graph.statistics().weak_components
+            if method == NetworkGraphCoarsening.Component
+            else None,
+            key=key,
+            max_clusters=max_clusters,
+        )
+
+    @memoize()
+    def coarsen(
+        self,
+        method: NetworkGraphCoarsening | str | None = None,
+        key: str | None = None,
+        max_clusters: int | None = 64,
+    ) -> 'NetworkGraph':
+        '''
+        Summarize the graph into at most `max_clusters` cluster nodes.
+
+        The summary graph keeps the number of members of each cluster in
+        the `size` column; see `clusters` for the membership.
+        '''
+        edges, nodes = aggregate_clusters(
+            edges=self.edges,
+            nodes=self.nodes,
+            clusters=self.clusters(
+                method=method,
+                key=key,
+                max_clusters=max_clusters,
+            ),
+        )
+        return NetworkGraph(
+            edges=edges,
+            nodes=nodes,
+        )
+
+    def subgraph(self, names: Iterable[str] | pl.Series) -> Self:
+        if not isinstance(names, pl.Series):
+            names = pl.Series(values=list(names), dtype=pl.String)
+        names = names.implode()
+
+        return self.model_copy(update={
+            'edges': self.edges.filter(
+                pl.col('start').is_in(names),
+                pl.col('end').is_in(names),
+            ),
+            'nodes': self.nodes.filter(pl.col('name').is_in(names)),
+        })
+
+    def lazy(self) -> 'LazyNetworkGraph':
+        return LazyNetworkGraph(
+            edges=self.edges.lazy(),
+            nodes=self.nodes.lazy(),
+        )
+
     def draw(
         self,
         backend: NetworkGraphDrawBackend | str | None = None,
         base_dir: Path | str | None = None,
         show: bool = True,
-    ) -> matplotlib.figure.Figure | pyvis.network.Network:
+    ) -> matplotlib.figure.Figure | str:
         if backend is None:
             backend = NetworkGraphDrawBackend.default()
         elif isinstance(backend, str):
@@ -138,63 +430,97 @@ class NetworkGraph(BaseModel, arbitrary_types_allowed=True):
         base_dir: Path | str | None = None,
         show: bool = True,
     ) -> matplotlib.figure.Figure:
-        G = self.to_networkx()
-
-        elarge = [
-            (u, v)
-            for (u, v, d) in G.edges(data=True)
-            if d['weight'] >= 1
-            and u != '__START__' and v != '__START__'
-        ]
-        esmall = [
-            (u, v)
-            for (u, v, d) in G.edges(data=True)
-            if d['weight'] < 1
-            and u != '__START__' and v != '__START__'
-        ]
-
-        # positions for all nodes - seed for reproducibility
-        pos = nx.circular_layout(G)
-
-        # nodes
-        nx.draw_networkx_nodes(
-            G=G, pos=pos,
-            nodelist=[
-                n for n in G.nodes()
-                if n != '__START__'
-            ],
-            node_size=700,
-        )
+        adjacency = self.adjacency()
+        pos = self.layout().select('x', 'y').to_numpy()
+
+        # NOTE: Render into an explicit figure; pyplot is only needed to
+        # show it on a local display.
+        if show and not _IS_STREAMLIT_RUNNING and _HAS_DISPLAY:
+            fig = plt.figure()
+        else:
+            fig = matplotlib.figure.Figure()
+        ax = fig.add_subplot()
+
+        # Mask out the special nodes and their edges
+        is_visible = ~adjacency.names.is_in(_STOP_WORDS).to_numpy()
+        starts = adjacency.start_ids
+        ends = adjacency.end_ids
+        edge_mask = is_visible[starts] & is_visible[ends]
+
+        weights = self.edges.get_column(
+            'traffic' if 'traffic' in self.edges.columns else 'capacity',
+        ).to_numpy()
+        segments = np.stack([pos[starts], pos[ends]], axis=1)
+
+        # NOTE: Thin out the lines of dense graphs
+        num_edges = int(edge_mask.sum())
+        is_dense = num_edges > _MAX_LABELS
+        width = 0.5 if is_dense else 6.0
+
+        # NOTE: Only draw the heaviest edges of huge graphs
+        if num_edges > _MAX_DRAWN_EDGES:
+            masked = np.where(edge_mask, weights, -np.inf)
+            heaviest = np.argpartition(masked, -_MAX_DRAWN_EDGES)
+            edge_mask = np.zeros_like(edge_mask)
+            edge_mask[heaviest[-_MAX_DRAWN_EDGES:]] = True
 
         # edges
-        nx.draw_networkx_edges(
-            G=G, pos=pos,
-            edgelist=elarge,
-            arrows=True, arrowsize=20, arrowstyle='->',
-            width=6,
-        )
-        nx.draw_networkx_edges(
-            G=G, pos=pos,
-            edgelist=esmall,
-            arrows=True, arrowsize=20, arrowstyle='->',
-            alpha=0.5, width=6,
-            edge_color='b', style='dashed',
-        )
+        # NOTE: The node positions bound the edges already, so skip scanning
+        # every segment for the data limits.
+        is_large = edge_mask & (weights >= 1)
+        ax.add_collection(LineCollection(
+            segments[is_large],
+            linewidths=width,
+            colors='k',
+            antialiaseds=not is_dense,
+        ), autolim=False)
+        is_small = edge_mask & (weights < 1)
+        ax.add_collection(LineCollection(
+            segments[is_small],
+            linewidths=width,
+            colors='b',
+            linestyles='dashed',
+            alpha=0.5,
+            antialiaseds=not is_dense,
+        ), autolim=False)
+        ax.update_datalim(pos[is_visible])
 
-        # node labels
-        nx.draw_networkx_labels(
-            G=G, pos=pos,
-            font_size=20, font_family='sans-serif',
+        # nodes
+        ax.scatter(
+            pos[is_visible, 0],
+            pos[is_visible, 1],
+            s=700 if is_visible.sum() <= _MAX_LABELS else 10,
+            zorder=2,
         )
-        # edge weight labels
-        edge_labels = nx.get_edge_attributes(G, 'weight')
-        nx.draw_networkx_edge_labels(G, pos, edge_labels)
 
-        fig, ax = plt.subplots()
+        # NOTE: Labels are only readable (and cheap) on small graphs
+        if is_visible.sum() <= _MAX_LABELS:
+            for name, (x, y) in zip(
+                adjacency.names.filter(is_visible),
+                pos[is_visible],
+            ):
+                ax.text(
+                    x, y, name,
+                    fontsize=20, fontfamily='sans-serif',
+                    ha='center', va='center', zorder=3,
+                )
+        if num_edges <= _MAX_LABELS:
+            for weight, (x, y) in zip(
+                weights[edge_mask],
+                segments[edge_mask].mean(axis=1),
+            ):
+                ax.text(
+                    x, y, str(weight),
+                    ha='center', va='center', zorder=3,
+                    bbox={'boxstyle': 'round', 'fc': 'w', 'ec': 'w'},
+                )
+
+        ax.autoscale_view()
         ax.margins(0.08)
         ax.axis('off')
-        ax.axis('off')
-        fig.tight_layout()
+        # NOTE: `tight_layout` renders the whole figure once just to measure
+        # it; without any axis decorations, filling the figure is the same.
+        fig.subplots_adjust(left=0, right=1, bottom=0, top=1)
 
         if base_dir is not None:
             fig.savefig(f'{base_dir}/output.png')
@@ -212,99 +538,228 @@ class NetworkGraph(BaseModel, arbitrary_types_allowed=True):
         self,
         base_dir: Path | str | None = None,
         show: bool = True,
-    ) -> pyvis.network.Network:
-        net = pyvis.network.Network()
-        net.add_nodes(
-            self.nodes.rows_by_key(('name',)),
-        )
-        # net.add_edges(
-        #     self.edges.rows_by_key(('start', 'end', 'traffic')),
-        # )
-        net.add_edges(
-            self.edges.rows_by_key(('start', 'end')),
-        )
+    ) -> str:
+        html = self.to_vis()
 
-        if base_dir is not None and show:
-            iframe = net.show(f'{base_dir}/output.html', notebook=False)
-            if _IS_STREAMLIT_RUNNING:
-                st.write(iframe)
-        return net
+        if base_dir is not None:
+            with open(f'{base_dir}/output.html', 'w') as f:
+                f.write(html)
+        if show and _IS_STREAMLIT_RUNNING:
+            st.components.v1.html(html, height=600)
+        return html
 
+    @memoize()
     def to_graphviz(self) -> graphviz.Digraph:
-        net = graphviz.Digraph()
+        # NOTE: Ordered
+        return graphviz.Digraph(
+            body=[
+                self._to_graphviz_edges(),
+                self._to_graphviz_nodes(),
+            ],
+        )
+
+    def _to_graphviz_edges(self) -> str:
+        start = pl.col('start')
+        end = pl.col('end')
+        capacity = pl.col('capacity')
 
-        # Add edges
-        STOP_WORDS = ['__START__', '__END__']
         has_traffic = 'traffic' in self.edges.columns
-        for start, end, capacity, *traffic in self.edges.rows_by_key((
-            'start',
-            'end',
-            'capacity',
-            'traffic',
-        )):
-            if start in STOP_WORDS or end in STOP_WORDS:
-                continue
-
-            if not traffic:
-                traffic = capacity
-            else:
-                traffic = traffic[0]
-
-            is_full = capacity <= traffic
-            is_overheat = capacity * 0.5 <= traffic
-            is_moderate = capacity * 0.2 <= traffic
-            is_empty = capacity <= 0
-
-            if is_empty:
-                continue
-
-            net.edge(
-                tail_name=start,
-                head_name=end,
-                label=f'{traffic}/{capacity}' if has_traffic else str(traffic),
-                # attributes
-                color=(
-                    'red' if is_full else (
-                        'orange' if is_overheat else (
-                            'yellow' if is_moderate else 'yellowgreen'
-                        )
-                    )
-                ) if has_traffic else 'black',
-                style='solid' if has_traffic else 'dashed',
-            )
+        label, color = _edge_style(has_traffic)
+
+        return self.edges.lazy() \
+            .filter(
+                ~start.is_in(_STOP_WORDS),
+                ~end.is_in(_STOP_WORDS),
+                capacity > 0,
+            ) \
+            .select(
+                pl.concat_str(
+                    pl.lit('\t'),
+                    _quote_dot(start),
+                    pl.lit(' -> '),
+                    _quote_dot(end),
+                    pl.lit(' [label='),
+                    _quote_dot(label),
+                    pl.lit(' color='),
+                    color,
+                    pl.lit(' style='),
+                    pl.lit('solid' if has_traffic else 'dashed'),
+                    pl.lit(']\n'),
+                ).str.join(''),
+            ) \
+            .collect() \
+            .item()
+
+    def _to_graphviz_nodes(self) -> str:
+        name = pl.col('name')
 
-        # Add nodes
         has_traffic = 'loss' in self.nodes.columns \
             and 'gain' in self.nodes.columns
-        for name, traffic, *io in self.nodes.rows_by_key((
-            'name',
-            'traffic',
-            'loss',
-            'gain',
-        )):
-            if name in STOP_WORDS:
-                continue
-
-            if len(io) == 2:
-                [loss, gain] = io
-            else:
-                loss = gain = 0
-
-            if has_traffic and max(loss, gain) == 0:
-                continue
-
-            net.node(
-                name=name,
-                label=f'{name} <-{loss}/+{gain}={gain - loss}>'
-                if has_traffic
-                else name,
-                # attributes
-                color=(
-                    'red' if loss < gain else 'blue'
-                ) if has_traffic else 'black',
+        if has_traffic:
+            # NOTE: Formatted in their own dtypes, e.g. `1.5` stays as is
+            loss = pl.col('loss')
+            gain = pl.col('gain')
+            predicates = [pl.max_horizontal(loss, gain) != 0]
+            label = pl.concat_str(
+                name,
+                pl.lit(' <-'),
+                loss.cast(pl.String),
+                pl.lit('/+'),
+                gain.cast(pl.String),
+                pl.lit('='),
+                (gain - loss).cast(pl.String),
+                pl.lit('>'),
             )
+            color = pl.when(loss < gain) \
+                .then(pl.lit('red')) \
+                .otherwise(pl.lit('blue'))
+        else:
+            predicates = []
+            label = name
+            color = pl.lit('black')
+
+        return self.nodes.lazy() \
+            .filter(~name.is_in(_STOP_WORDS), *predicates) \
+            .select(
+                pl.concat_str(
+                    pl.lit('\t'),
+                    _quote_dot(name),
+                    pl.lit(' [label='),
+                    _quote_dot(label),
+                    pl.lit(' color='),
+                    color,
+                    pl.lit(']\n'),
+                ).str.join(''),
+            ) \
+            .collect() \
+            .item()
+
+    @memoize()
+    def to_vis(
+        self,
+        max_nodes: int | None = 1_000,
+        max_edges: int | None = 5_000,
+    ) -> str:
+        '''
+        Render the graph into a vis.js HTML page, in memory.
+
+        Only the `max_nodes` nodes and then the `max_edges` edges with the
+        most traffic (or capacity) are kept, and the nodes are placed with
+        `layout` so that the browser does not need to simulate them.
+        '''
+        has_traffic = 'traffic' in self.edges.columns
+        weight = pl.col('traffic' if has_traffic else 'capacity')
 
-        return net
+        graph = self.subgraph(
+            self.nodes.get_column('name').filter(
+                ~self.nodes.get_column('name').is_in(_STOP_WORDS),
+            ),
+        )
+        if max_nodes is not None and graph.nodes.height > max_nodes:
+            # NOTE: Rank the nodes by the traffic passing through them
+            flows = pl.concat([
+                graph.edges.select(name='start', weight=weight),
+                graph.edges.select(name='end', weight=weight),
+            ]).group_by('name').agg(pl.col('weight').sum())
+            graph = graph.subgraph(
+                graph.nodes
+                .join(flows, on='name', how='left', maintain_order='left')
+                .sort(
+                    pl.col('weight').fill_null(0),
+                    descending=True,
+                    maintain_order=True,
+                )
+                .head(max_nodes)
+                .get_column('name'),
+            )
+        if max_edges is not None and graph.edges.height > max_edges:
+            graph = graph.model_copy(update={
+                'edges': graph.edges
+                .sort(weight, descending=True, maintain_order=True)
+                .head(max_edges),
+            })
+
+        # NOTE: Spread the nodes about 100px apart
+        layout = graph.layout()
+        scale = 100 * np.sqrt(max(layout.height, 1))
+        nodes = graph.nodes.select(
+            id=pl.col('name'),
+            label=pl.col('name'),
+        ).join(
+            layout.select(
+                'name',
+                x=pl.col('x') * scale,
+                y=pl.col('y') * scale,
+            ),
+            left_on='id',
+            right_on='name',
+            how='left',
+            maintain_order='left',
+        )
+
+        label, color = _edge_style(has_traffic)
+        edges = graph.edges.select(
+            pl.col('start').alias('from'),
+            pl.col('end').alias('to'),
+            title=label,
+            color=color,
+            value=weight,
+        )
+        return render_vis_html(nodes, edges)
+
+    @memoize()
+    def to_geojson(self) -> str:
+        '''
+        Convert the nodes into a GeoJSON FeatureCollection of points, with
+        the other node attributes as their properties.
+        '''
+        features = self.nodes.lazy() \
+            .filter(~pl.col('name').is_in(_STOP_WORDS)) \
+            .select(
+                type=pl.lit('Feature'),
+                geometry=pl.struct(
+                    type=pl.lit('Point'),
+                    coordinates=pl.concat_list('longitude', 'latitude'),
+                ),
+                properties=pl.struct(pl.exclude('latitude', 'longitude')),
+            ) \
+            .collect() \
+            .write_json()
+        return f'{{"type":"FeatureCollection","features":{features}}}'
+
+    @memoize()
+    def to_polylines(self) -> dict[str, np.ndarray]:
+        '''
+        Group the edges by their utilization colour, as arrays of
+        `[[start_lat, start_lon], [end_lat, end_lon]]` segments.
+        '''
+        start = pl.col('start')
+        end = pl.col('end')
+        _, color = _edge_style('traffic' in self.edges.columns)
+
+        locations = self.nodes.lazy().select('name', 'latitude', 'longitude')
+        segments = self.edges.lazy() \
+            .filter(
+                ~start.is_in(_STOP_WORDS),
+                ~end.is_in(_STOP_WORDS),
+                pl.col('capacity') > 0,
+            ) \
+            .select(start, end, color=color) \
+            .join(locations, left_on='start', right_on='name') \
+            .join(locations, left_on='end', right_on='name', suffix='_end') \
+            .collect()
+        return {
+            color: df.select(
+                'latitude',
+                'longitude',
+                'latitude_end',
+                'longitude_end',
+            ).to_numpy().reshape(-1, 2, 2)
+            for (color, ), df in segments.partition_by(
+                'color',
+                as_dict=True,
+            ).items()
+        }
 
     def to_networkx(self) -> nx.Graph:
         net = nx.Graph()
@@ -322,41 +777,30 @@ class OptimalNetworkGraph(NetworkGraph):
 
     @override
     @classmethod
-    def load(
+    def _load_from(
         cls,
-        fileobj: str | Path | IO[bytes],
+        archive: NetworkGraphArchiveReader,
+        node_filter: pl.Expr | None = None,
+        edge_filter: pl.Expr | None = None,
+        **kwargs: Any,
     ) -> Self:
-        archive = TarFile(
-            fileobj=fileobj,  # type: ignore
-            mode='r',
+        optimization = archive.read_json('optimization')
+        return super()._load_from(
+            archive,
+            node_filter=node_filter,
+            edge_filter=edge_filter,
+            total_cost=optimization['cost'],
+            **kwargs,
         )
-        this = cls(
-            edges=_load_dataframe(
-                archive=archive,
-                name='edges',
-            ),
-            nodes=_load_dataframe(
-                archive=archive,
-                name='nodes',
-            ),
-            **_load_json(
-                archive=archive,
-                name='optimization.json',
-            )
-        )
-        archive.close()
-
-        return this
 
     @override
     def _dump_to(
         self,
-        archive: TarFile,
+        archive: NetworkGraphArchiveWriter,
     ) -> None:
         super()._dump_to(archive)
 
-        _dump_json(
-            archive=archive,
+        archive.write_json(
             name='optimization',
             data={
                 'cost': self.total_cost,
@@ -364,50 +808,134 @@ class OptimalNetworkGraph(NetworkGraph):
         )
 
 
-def _load_dataframe(
-    archive: TarFile,
-    name: str,
-) -> pl.DataFrame:
-    buffer = archive.extractfile(f'{name}.parquet')
-    if buffer is None:
-        raise ValueError(f'Empty {name} data')
-    return pl.read_parquet(buffer)
+class LazyNetworkGraph(BaseModel, arbitrary_types_allowed=True):
+    '''
+    A network graph whose frames are polars query plans.
 
+    Filters and projections are only recorded; the plans of both frames
+    are optimized and collected together, once the graph is rendered or
+    solved.
+    '''
 
-def _load_json(
-    archive: TarFile,
-    name: str,
-) -> Any:
-    buffer = archive.extractfile(f'{name}.json')
-    if buffer is None:
-        raise ValueError(f'Empty {name} data')
-    return json.load(buffer)
+    edges: pl.LazyFrame
+    nodes: pl.LazyFrame
 
+    @classmethod
+    def scan(
+        cls,
+        edges: str | Path,
+        nodes: str | Path,
+    ) -> Self:
+        return cls(
+            edges=_scan_dataframe(edges),
+            nodes=_scan_dataframe(nodes),
+        )
 
-def _dump_dataframe(
-    archive: TarFile,
-    name: str,
-    df: pl.DataFrame,
-) -> None:
-    buffer = BytesIO()
-    df.write_parquet(buffer, compression='uncompressed')
-    buffer.seek(0)
-
-    info = TarInfo(f'{name}.parquet')
-    info.size = buffer.getbuffer().nbytes
+    def collect(
+        self,
+        streaming: bool = False,
+    ) -> NetworkGraph:
+        edges, nodes = pl.collect_all(
+            [self.edges, self.nodes],
+            engine='streaming' if streaming else 'auto',
+        )
+        return NetworkGraph(
+            edges=edges,
+            nodes=nodes,
+        )
 
-    archive.addfile(info, buffer)
+    def filter_edges(self, *predicates: pl.Expr) -> Self:
+        return self.model_copy(update={
+            'edges': self.edges.filter(*predicates),
+        })
+
+    def filter_nodes(self, *predicates: pl.Expr) -> Self:
+        return self.model_copy(update={
+            'nodes': self.nodes.filter(*predicates),
+        })
+
+    def select(self, columns: Iterable[str]) -> Self:
+        columns = set(columns) | {'name', 'start', 'end'}
+        return self.model_copy(update={
+            key: lf.select(
+                column
+                for column in lf.collect_schema().names()
+                if column in columns
+            )
+            for key, lf in (('edges', self.edges), ('nodes', self.nodes))
+        })
 
+    def with_edge_distances(
+        self,
+        cost_per_km: float | None = None,
+    ) -> Self:
+        return self.model_copy(update={
+            'edges': with_edge_distances(
+                edges=self.edges,
+                nodes=self.nodes,
+                cost_per_km=cost_per_km,
+            ),
+        })
 
-def _dump_json(
-    archive: TarFile,
-    name: str,
-    data: Any,
+    def is_geolocational(self) -> bool:
+        schema = self.nodes.collect_schema()
+        return 'latitude' in schema and 'longitude' in schema
+
+
+def _edge_style(has_traffic: bool) -> tuple[pl.Expr, pl.Expr]:
+    capacity = pl.col('capacity')
+    if not has_traffic:
+        return capacity.cast(pl.String), pl.lit('black')
+
+    traffic = pl.col('traffic')
+    label = pl.concat_str(
+        traffic.cast(pl.String),
+        pl.lit('/'),
+        capacity.cast(pl.String),
+    )
+    color = pl.when(capacity <= traffic).then(pl.lit('red')) \
+        .when(capacity * 0.5 <= traffic).then(pl.lit('orange')) \
+        .when(capacity * 0.2 <= traffic).then(pl.lit('yellow')) \
+        .otherwise(pl.lit('yellowgreen'))
+    return label, color
+
+
+def _quote_dot(expr: pl.Expr) -> pl.Expr:
+    '''
+    Quote DOT identifiers in bulk, following `graphviz.quoting.quote`.
+    '''
+    is_html = expr.str.contains(r'(?s)^<.*>$')
+    is_id = expr.str.contains(
+        r'^(?:[a-zA-Z_][a-zA-Z0-9_]*|-?(?:\.[0-9]+|[0-9]+(?:\.[0-9]*)?))$',
+    ) & ~expr.str.to_lowercase().is_in(_DOT_KEYWORDS)
+
+    return pl.when(is_html | is_id) \
+        .then(expr) \
+        .otherwise(pl.concat_str(
+            pl.lit('"'),
+            expr.str.replace_all(r'((?:\\\\)*)\\?"', r'$1\"'),
+            pl.lit('"'),
+        ))
+
+
+def _hash_dataframe(
+    hasher: hashlib.blake2b,
+    df: pl.DataFrame,
 ) -> None:
-    value = json.dumps(data).encode('utf-8')
-    buffer = BytesIO(value)
-
-    info = TarInfo(f'{name}.json')
-    info.size = buffer.getbuffer().nbytes
-
-    archive.addfile(info, buffer)
+    hasher.update(repr(df.schema).encode('utf-8'))
+    if df.width > 0:
+        hasher.update(df.hash_rows(seed=0).to_numpy().tobytes())
+
+
+def _scan_dataframe(
+    path: str | Path,
+) -> pl.LazyFrame:
+    match Path(path).suffix:
+        case '.csv':
+            return pl.scan_csv(path)
+        case '.arrow' | '.feather' | '.ipc':
+            return pl.scan_ipc(path)
+        case '.parquet':
+            return pl.scan_parquet(path)
+        case suffix:
+            raise ValueError(f'Unsupported file type: {suffix}')
@@ -0,0 +1,283 @@
+from enum import Enum
+
+import numpy as np
+import polars as pl
+
+from kubegraph.data.adjacency import NetworkGraphAdjacency
+
+
+_FAR_GRID_SIZE = 8
+_MAX_PAIRS_PER_NODE = 32
+
+
+class NetworkGraphLayout(Enum):
+    Circular = 'circular'
+    ForceDirected = 'force_directed'
+
+    @classmethod
+    def default(cls) -> 'NetworkGraphLayout':
+        return cls.ForceDirected
+
+
+def compute_layout(
+    adjacency: NetworkGraphAdjacency,
+    method: NetworkGraphLayout,
+    initial: pl.DataFrame | None = None,
+    hidden: np.ndarray | None = None,
+    iterations: int | None = None,
+    seed: int = 0,
+) -> pl.DataFrame:
+    '''
+    Place every node of the adjacency onto the plane.
+
+    The positions (`x`, `y`) are returned in the adjacency node order. The
+    force-directed layout starts from the `initial` positions of the nodes
+    it knows (e.g. the layout of the previous snapshot of a series), so
+    that successive layouts move as little as possible. The `hidden` nodes
+    and their edges do not take part in the layout.
+    '''
+    num_nodes = adjacency.num_nodes
+    if hidden is None:
+        hidden = np.zeros(num_nodes, dtype=bool)
+
+    # Drop the hidden nodes
+    visible = np.flatnonzero(~hidden)
+    ids = np.full(num_nodes, -1, dtype=np.int64)
+    ids[visible] = np.arange(visible.size)
+    start_ids = ids[adjacency.start_ids]
+    end_ids = ids[adjacency.end_ids]
+    is_visible = (start_ids >= 0) & (end_ids >= 0)
+    start_ids = start_ids[is_visible]
+    end_ids = end_ids[is_visible]
+
+    match method:
+        case NetworkGraphLayout.Circular:
+            theta = np.linspace(0, 2 * np.pi, visible.size, endpoint=False)
+            positions = np.column_stack([np.cos(theta), np.sin(theta)])
+        case NetworkGraphLayout.ForceDirected:
+            rng = np.random.default_rng(seed)
+            k = 1 / np.sqrt(max(visible.size, 1))
+            if initial is None:
+                positions = rng.random((visible.size, 2))
+                temperature = 0.1
+                default_iterations = 50
+            else:
+                positions = _warm_start(
+                    names=adjacency.names.gather(visible),
+                    start_ids=start_ids,
+                    end_ids=end_ids,
+                    initial=initial,
+                    rng=rng,
+                    k=k,
+                )
+                temperature = k
+                default_iterations = 15
+            positions = _force_directed(
+                start_ids=start_ids,
+                end_ids=end_ids,
+                positions=positions,
+                iterations=iterations or default_iterations,
+                temperature=temperature,
+                k=k,
+            )
+
+    # NOTE: Park the hidden nodes in the middle
+    layout = np.zeros((num_nodes, 2))
+    if visible.size:
+        layout[:] = positions.mean(axis=0)
+        layout[visible] = positions
+    return pl.DataFrame({
+        'name': adjacency.names,
+        'x': layout[:, 0],
+        'y': layout[:, 1],
+    })
+
+
+def _warm_start(
+    names: pl.Series,
+    start_ids: np.ndarray,
+    end_ids: np.ndarray,
+    initial: pl.DataFrame,
+    rng: np.random.Generator,
+    k: float,
+) -> np.ndarray:
+    positions = names.to_frame('name').join(
+        initial.select('name', 'x', 'y'),
+        on='name',
+        how='left',
+        maintain_order='left',
+    ).select('x', 'y').to_numpy().astype(np.float64)
+
+    is_known = ~np.isnan(positions[:, 0])
+    if is_known.all():
+        return positions
+    if not is_known.any():
+        return rng.random(positions.shape)
+
+    # NOTE: Place the new nodes next to their known neighbours, if any
+    num_nodes = positions.shape[0]
+    src = np.concatenate([start_ids, end_ids])
+    dst = np.concatenate([end_ids, start_ids])
+    is_anchor = ~is_known[src] & is_known[dst]
+    src = src[is_anchor]
+    dst = dst[is_anchor]
+    counts = np.bincount(src, minlength=num_nodes)
+    sums = np.column_stack([
+        np.bincount(src, positions[dst, axis], num_nodes)
+        for axis in range(2)
+    ])
+
+    missing = np.flatnonzero(~is_known)
+    anchors = np.where(
+        (counts[missing] > 0)[:, None],
+        sums[missing] / np.maximum(counts[missing], 1)[:, None],
+        positions[is_known].mean(axis=0),
+    )
+    positions[missing] = anchors + rng.normal(0, k, (missing.size, 2))
+    return positions
+
+
+def _force_directed(
+    start_ids: np.ndarray,
+    end_ids: np.ndarray,
+    positions: np.ndarray,
+    iterations: int,
+    temperature: float,
+    k: float,
+) -> np.ndarray:
+    '''
+    Fruchterman-Reingold, with the repulsion approximated on a grid.
+    '''
+    num_nodes = positions.shape[0]
+    if num_nodes < 2:
+        return positions
+
+    is_loop = start_ids == end_ids
+    start_ids = start_ids[~is_loop]
+    end_ids = end_ids[~is_loop]
+
+    for step in range(iterations):
+        displacement = _repulsion(positions, k) \
+            + _far_repulsion(positions, k)
+
+        # Attract the endpoints of every edge
+        delta = positions[start_ids] - positions[end_ids]
+        force = delta * (np.hypot(delta[:, 0], delta[:, 1]) / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] += \
+                np.bincount(end_ids, force[:, axis], num_nodes) \
+                - np.bincount(start_ids, force[:, axis], num_nodes)
+
+        # Cool down linearly
+        limit = temperature * (1 - step / iterations)
+        length = np.hypot(displacement[:, 0], displacement[:, 1])
+        scale = np.minimum(length, limit) / np.maximum(length, 1e-12)
+        positions = positions + displacement * scale[:, None]
+    return positions
+
+
+def _repulsion(
+    positions: np.ndarray,
+    k: float,
+) -> np.ndarray:
+    num_nodes = positions.shape[0]
+
+    # NOTE: Only the nodes in the neighbouring cells repel each other, and
+    # the cells of the crowded layouts shrink to bound the number of pairs
+    lower = positions.min(axis=0)
+    extent = float((positions.max(axis=0) - lower).max())
+    cell = max(2 * k, extent / np.sqrt(num_nodes))
+    for _ in range(4):
+        size = int(extent // cell) + 1
+        grid = ((positions - lower) // cell).astype(np.int64)
+        cells = grid[:, 0] * size + grid[:, 1]
+        counts = np.bincount(cells, minlength=size * size)
+
+        num_pairs = 5 * int(np.dot(counts, counts))
+        if num_pairs <= _MAX_PAIRS_PER_NODE * num_nodes:
+            break
+        cell = max(
+            cell * np.sqrt(_MAX_PAIRS_PER_NODE * num_nodes / num_pairs),
+            extent / (4 * np.sqrt(num_nodes)),
+        )
+
+    order = np.argsort(cells, kind='stable')
+    offsets = np.cumsum(counts) - counts
+
+    # NOTE: Visit every pair of the neighbouring cells only once
+    displacement = np.zeros_like(positions)
+    for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        gx = grid[:, 0] + dx
+        gy = grid[:, 1] + dy
+        is_valid = (gx < size) & (gy >= 0) & (gy < size)
+        neighbours = np.where(is_valid, gx * size + gy, 0)
+        num_pairs = np.where(is_valid, counts[neighbours], 0)
+
+        # Enumerate every pair of the node and its neighbour cell
+        src = np.repeat(np.arange(num_nodes), num_pairs)
+        dst = order[
+            np.arange(num_pairs.sum())
+            - np.repeat(np.cumsum(num_pairs) - num_pairs, num_pairs)
+            + np.repeat(offsets[neighbours], num_pairs)
+        ]
+        is_pair = src != dst
+        src = src[is_pair]
+        dst = dst[is_pair]
+
+        delta = positions[src] - positions[dst]
+        distance = np.maximum(
+            np.einsum('ij,ij->i', delta, delta),
+            (1e-2 * k) ** 2,
+        )
+        force = delta * np.where(
+            distance < cell ** 2,
+            k ** 2 / distance,
+            0,
+        )[:, None]
+        for axis in range(2):
+            displacement[:, axis] += \
+                np.bincount(src, force[:, axis], num_nodes)
+            if dx or dy:
+                displacement[:, axis] -= \
+                    np.bincount(dst, force[:, axis], num_nodes)
+    return displacement
+
+
+def _far_repulsion(
+    positions: np.ndarray,
+    k: float,
+    chunk_size: int = 1 << 12,
+) -> np.ndarray:
+    num_nodes = positions.shape[0]
+
+    # NOTE: The distant nodes repel as the centroids of the coarse cells
+    lower = positions.min(axis=0)
+    extent = float((positions.max(axis=0) - lower).max())
+    cell = max(extent / _FAR_GRID_SIZE, 1e-12)
+    grid = np.minimum(
+        ((positions - lower) // cell).astype(np.int64),
+        _FAR_GRID_SIZE - 1,
+    )
+    cells = grid[:, 0] * _FAR_GRID_SIZE + grid[:, 1]
+    masses = np.bincount(cells, minlength=_FAR_GRID_SIZE ** 2)
+    is_occupied = masses > 0
+    masses = masses[is_occupied]
+    centroids = np.column_stack([
+        np.bincount(cells, positions[:, axis], _FAR_GRID_SIZE ** 2)
+        for axis in range(2)
+    ])[is_occupied] / masses[:, None]
+
+    displacement = np.empty_like(positions)
+    for begin in range(0, num_nodes, chunk_size):
+        chunk = positions[begin:begin + chunk_size]
+        delta = chunk[:, None, :] - centroids[None, :, :]
+        distance = np.einsum('ijk,ijk->ij', delta, delta)
+        weights = np.where(
+            distance > cell ** 2,
+            masses * k ** 2 / np.maximum(distance, 1e-12),
+            0,
+        )
+        displacement[begin:begin + chunk_size] = np.einsum(
+            'ij,ijk->ik', weights, delta,
+        )
+    return displacement
@@ -1,10 +1,19 @@
 from abc import ABCMeta, abstractmethod
-from typing import Self, override
+from itertools import count
+import re
+from typing import Any, Iterator, Self, override
 
+import numpy as np
 import polars as pl
 from pydantic import BaseModel
 
+from kubegraph.data.cache import FingerprintCache, memoize
+from kubegraph.data.db.base import NetworkGraphRef
+from kubegraph.data.db.history import LocalNetworkGraphHistory
 from kubegraph.data.graph import NetworkGraph
+from kubegraph.data.sql import PreparedQuery, prepare
+
+_HISTORY_TABLES = re.compile(r'\b(?:edges|nodes)_history\b', re.IGNORECASE)
 
 
 class NetworkGraphSeriesMixin[SqlResult](BaseModel, metaclass=ABCMeta):
@@ -16,7 +25,11 @@ class NetworkGraphSeriesMixin[SqlResult](BaseModel, metaclass=ABCMeta):
         pass
 
     @abstractmethod
-    def __sql__(self, query: str) -> SqlResult:
+    def __sql__(
+        self,
+        query: str | PreparedQuery,
+        **parameters: Any,
+    ) -> SqlResult:
         pass
 
     def step(self, nstep: int = 1) -> Self:
@@ -27,20 +40,58 @@ class NetworkGraphSeriesMixin[SqlResult](BaseModel, metaclass=ABCMeta):
 
         series = self
         for _ in range(nstep):
-            series = next(self)
+            series = next(series)
         return series
 
+    def iter_steps(self, nstep: int | None = None) -> Iterator[Self]:
+        '''
+        Lazily yield the next `nstep` snapshots (or endlessly, if `None`).
+        '''
+        series = self
+        for _ in range(nstep) if nstep is not None else count():
+            series = next(series)
+            yield series
+
 
 class NetworkGraphSeries(
     NetworkGraph,
     NetworkGraphSeriesMixin[pl.LazyFrame],
 ):
-    _ctx: pl.SQLContext | None = None
+    '''
+    A network graph that advances in time by `step_unit` (a polars
+    duration, e.g. `15m` or `1d`).
+
+    The series draws every snapshot from the frames it started from (its
+    origin): the supply (`traffic`) of every node around its mean with its
+    `std`, as the solver does, and the `traffic` of every edge likewise
+    when the edges have a `std`, clipped to their `capacity`. The draws of
+    every step are seeded by `seed` and the step `index` only, so a
+    snapshot is the same whether it is reached by `next`, `step` or
+    `simulate`.
+
+    SQL queries see the `edges` and `nodes` tables. Their plans are cached
+    by the fingerprint and the query (with its `:parameters` bound), so
+    the queries repeated by every rerun are parsed and planned once.
+
+    With a `history` store and a `ref`, SQL queries also see the
+    `edges_history` and `nodes_history` tables: the snapshots of `ref`
+    persisted so far (see `persist`), unioned over their partitions with
+    their `timestamp` (and `day`). They are scanned lazily, so the
+    predicates and the projections of a query are pushed down into the
+    parquet scans; a predicate on `day` skips whole partitions. Such
+    plans list the files when they are built, so they are not cached.
+    '''
+
+    seed: int = 0
+    index: int = 0
+    history: LocalNetworkGraphHistory | None = None
+    ref: NetworkGraphRef | None = None
+
+    _origin: 'NetworkGraphSeries | None' = None
 
     @override
     def __next__(self) -> Self:
-        # TODO: to be implemented
-        return self.model_copy()
+        return self.step(1)
 
     @override
     def __repr__(self) -> str:
@@ -51,18 +102,222 @@ class NetworkGraphSeries(
             f'step_unit={self.step_unit!r})'
 
     @override
-    def __sql__(self, query: str) -> pl.LazyFrame:
-        if self._ctx is None:
-            # Connect to database
-            self._ctx = pl.SQLContext(
-                frames={
-                    'edges': self.edges,
-                    'nodes': self.nodes,
-                },
-                register_globals=False,
+    def model_copy(
+        self,
+        *,
+        update: dict[str, Any] | None = None,
+        deep: bool = False,
+    ) -> Self:
+        this = super().model_copy(update=update, deep=deep)
+        if update:
+            # NOTE: An updated snapshot is the origin of its own steps, so
+            # that they draw from (and keep) the updated fields
+            this._origin = None
+        return this
+
+    @override
+    def __sql__(
+        self,
+        query: str | PreparedQuery,
+        **parameters: Any,
+    ) -> pl.LazyFrame:
+        if isinstance(query, str):
+            query = prepare(query)
+        bound = query.bind(**parameters)
+        if _HISTORY_TABLES.search(bound):
+            return self._execute(bound, history=True)
+        return self._plan(bound)
+
+    @classmethod
+    def sql_cache(cls) -> FingerprintCache[pl.LazyFrame]:
+        '''
+        Return the query plan cache, along with its hit/miss counters.
+        '''
+        return cls._plan.cache  # type: ignore
+
+    def persist(self) -> None:
+        '''
+        Append this snapshot to the `history` of its `ref`.
+        '''
+        history, ref = self._history_of()
+        history.append(ref.kind, ref.namespace, self)
+
+    def _history_of(
+        self,
+    ) -> tuple[LocalNetworkGraphHistory, NetworkGraphRef]:
+        if self.history is None or self.ref is None:
+            raise ValueError('The series has no history')
+        return self.history, self.ref
+
+    @memoize(maxsize=64)
+    def _plan(self, query: str) -> pl.LazyFrame:
+        return self._execute(query)
+
+    def _execute(
+        self,
+        query: str,
+        history: bool = False,
+    ) -> pl.LazyFrame:
+        # NOTE: The plans embed the frames, so they are only valid for the
+        # same content; a fresh context never sees replaced frames
+        frames = {
+            'edges': self.edges,
+            'nodes': self.nodes,
+        }
+        if history:
+            store, ref = self._history_of()
+            edges, nodes = store.scan(
+                kind=ref.kind,
+                namespace=ref.namespace,
             )
+            frames['edges_history'] = _with_columns_of(edges, self.edges)
+            frames['nodes_history'] = _with_columns_of(nodes, self.nodes)
 
-        return self._ctx.execute(
+        ctx = pl.SQLContext(
+            frames=frames,
+            register_globals=False,
+        )
+        return ctx.execute(
             query=query,
             eager=False,
         )
+
+    @override
+    def step(self, nstep: int = 1) -> Self:
+        if nstep == 0:
+            return self
+        elif nstep < 0:
+            raise ValueError('Negative step is not supported yet')
+
+        # NOTE: Jump straight to the snapshot; the steps are independent
+        origin = self._origin or self
+        edges, nodes, timestamps = origin._simulate(self.index + nstep, 1)
+        this = origin.model_copy(update={
+            'edges': edges,
+            'nodes': nodes,
+            'timestamp': timestamps.dt.to_string('iso').item(),
+            'index': self.index + nstep,
+        })
+        this._origin = origin
+        return this
+
+    def simulate(self, nstep: int) -> tuple[pl.DataFrame, pl.DataFrame]:
+        '''
+        Draw the next `nstep` snapshots at once, stacked into an edges and a
+        nodes frame with the `step` index and the `timestamp` of each row.
+        '''
+        if nstep < 0:
+            raise ValueError('Negative step is not supported yet')
+
+        origin = self._origin or self
+        edges, nodes, timestamps = origin._simulate(self.index + 1, nstep)
+
+        def stack(df: pl.DataFrame) -> pl.DataFrame:
+            steps = np.repeat(
+                np.arange(nstep, dtype=np.int64),
+                df.height // max(nstep, 1),
+            )
+            return pl.concat(
+                [
+                    pl.DataFrame({
+                        'step': self.index + 1 + steps,
+                        'timestamp': timestamps.gather(steps),
+                    }),
+                    df,
+                ],
+                how='horizontal',
+            )
+
+        return stack(edges), stack(nodes)
+
+    def _simulate(
+        self,
+        start: int,
+        nstep: int,
+    ) -> tuple[pl.DataFrame, pl.DataFrame, pl.Series]:
+        # NOTE: The draws of every step come from its own generator, so
+        # that they do not depend on the steps drawn along with it
+        edge_mean, edge_std = _parameters_of(self.edges)
+        node_mean, node_std = _parameters_of(self.nodes)
+        edge_noise = np.empty((nstep, edge_mean.size))
+        node_noise = np.empty((nstep, node_mean.size))
+        for offset in range(nstep):
+            rng = np.random.default_rng([self.seed, start + offset])
+            rng.standard_normal(out=node_noise[offset])
+            rng.standard_normal(out=edge_noise[offset])
+
+        edge_traffic = _draw(edge_mean, edge_std, edge_noise)
+        if 'capacity' in self.edges.columns and edge_traffic.size:
+            edge_traffic = np.minimum(
+                edge_traffic,
+                self.edges.get_column('capacity').fill_null(0).to_numpy(),
+            )
+
+        def repeat(df: pl.DataFrame, traffic: np.ndarray) -> pl.DataFrame:
+            df = pl.concat([df] * nstep) if nstep else df.clear()
+            if 'traffic' not in df.columns:
+                return df
+            return df.with_columns(
+                pl.Series(
+                    name='traffic',
+                    values=traffic.ravel(),
+                ).cast(df.schema['traffic']),
+            )
+
+        timestamps = pl.Series(
+            values=[self.timestamp] * nstep,
+            dtype=pl.String,
+        ) \
+            .str.to_datetime() \
+            .dt.offset_by(pl.Series(values=[
+                _scale_duration(self.step_unit, step - self.index)
+                for step in range(start, start + nstep)
+            ], dtype=pl.String)) \
+            .alias('timestamp')
+
+        return (
+            repeat(self.edges, edge_traffic),
+            repeat(self.nodes, _draw(node_mean, node_std, node_noise)),
+            timestamps,
+        )
+
+
+def _with_columns_of(df: pl.LazyFrame, snapshot: pl.DataFrame) -> pl.LazyFrame:
+    # NOTE: The columns not persisted yet (e.g. before the first append)
+    # are null, so that the queries of the snapshot are valid on its history
+    schema = df.collect_schema()
+    return df.with_columns(
+        pl.lit(None, dtype).alias(column)
+        for column, dtype in snapshot.schema.items()
+        if column not in schema
+    )
+
+
+def _parameters_of(df: pl.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    if 'traffic' not in df.columns:
+        return np.empty(0), np.empty(0)
+
+    mean = df.get_column('traffic').fill_null(0).to_numpy() \
+        .astype(np.float64)
+    if 'std' not in df.columns:
+        return mean, np.zeros_like(mean)
+    std = df.get_column('std').fill_null(0).to_numpy().astype(np.float64)
+    return mean, std
+
+
+def _draw(
+    mean: np.ndarray,
+    std: np.ndarray,
+    noise: np.ndarray,
+) -> np.ndarray:
+    values = np.maximum(np.trunc(mean + std * noise), 0)
+    return np.where(std > 0, values, mean)
+
+
+def _scale_duration(duration: str, factor: int) -> str:
+    # NOTE: Scale every component of a compound duration, e.g. `1h30m`
+    return re.sub(
+        r'\d+',
+        lambda match: str(int(match[0]) * factor),
+        duration,
+    )
@@ -0,0 +1,185 @@
+import numpy as np
+import polars as pl
+from pydantic import BaseModel
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+class NetworkGraphSpatialIndex(BaseModel, arbitrary_types_allowed=True):
+    '''
+    A spatial index over the coordinates of geolocational nodes.
+
+    The nodes are projected onto the unit sphere (ECEF), so that the
+    euclidean distances of the k-d tree are monotonic to the great-circle
+    distances everywhere, including the poles and the antimeridian. The
+    queries take arrays of points and return long frames of
+    (`query`, `name`, `distance`), with the distances in kilometers.
+    '''
+
+    names: pl.Series
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    tree: cKDTree
+
+    @classmethod
+    def from_frame(
+        cls,
+        nodes: pl.DataFrame,
+    ) -> 'NetworkGraphSpatialIndex':
+        nodes = nodes.select('name', 'latitude', 'longitude').drop_nulls()
+        latitudes = nodes.get_column('latitude').to_numpy().astype(np.float64)
+        longitudes = nodes.get_column('longitude').to_numpy() \
+            .astype(np.float64)
+        return cls(
+            names=nodes.get_column('name'),
+            latitudes=latitudes,
+            longitudes=longitudes,
+            tree=cKDTree(to_unit_sphere(latitudes, longitudes)),
+        )
+
+    @property
+    def num_nodes(self) -> int:
+        return self.names.len()
+
+    def nearest(
+        self,
+        latitudes: np.ndarray | list[float],
+        longitudes: np.ndarray | list[float],
+        k: int = 1,
+    ) -> pl.DataFrame:
+        '''
+        Find the `k` nearest nodes of every point, nearest first.
+        '''
+        points = to_unit_sphere(latitudes, longitudes).reshape(-1, 3)
+        k = min(k, self.num_nodes)
+        if k == 0:
+            return self._matches(
+                np.empty(0, np.int64),
+                np.empty(0, np.int64),
+                np.empty(0),
+            )
+
+        chords, ids = self.tree.query(points, k=k)
+        chords = np.asarray(chords).reshape(-1, k)
+        ids = np.asarray(ids).reshape(-1, k)
+        queries = np.repeat(np.arange(ids.shape[0]), k)
+        return self._matches(queries, ids.ravel(), chords.ravel())
+
+    def within_radius(
+        self,
+        latitudes: np.ndarray | list[float],
+        longitudes: np.ndarray | list[float],
+        radius: float,
+    ) -> pl.DataFrame:
+        '''
+        Find the nodes within `radius` kilometers of every point.
+        '''
+        points = to_unit_sphere(latitudes, longitudes).reshape(-1, 3)
+        matches = self.tree.query_ball_point(
+            points,
+            r=_to_chord(radius),
+            return_sorted=True,
+        )
+        counts = np.fromiter(map(len, matches), np.int64, len(matches))
+        queries = np.repeat(np.arange(len(matches)), counts)
+        ids = np.concatenate([np.empty(0, np.int64), *matches]) \
+            .astype(np.int64)
+        chords = np.linalg.norm(self.tree.data[ids] - points[queries], axis=1)
+        return self._matches(queries, ids, chords)
+
+    def within_bounds(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+    ) -> pl.Series:
+        '''
+        Find the nodes inside a map viewport; `west > east` wraps around
+        the antimeridian.
+        '''
+        span = east - west if west <= east else east - west + 360
+
+        # NOTE: Prune with the ball around the viewport, whose farthest
+        # points lie on its boundary, then clip exactly
+        steps = np.linspace(0, 1, 33)
+        boundary = to_unit_sphere(
+            np.concatenate([
+                south + (north - south) * steps,
+                south + (north - south) * steps,
+                np.full_like(steps, south),
+                np.full_like(steps, north),
+            ]),
+            np.concatenate([
+                np.full_like(steps, west),
+                np.full_like(steps, west + span),
+                west + span * steps,
+                west + span * steps,
+            ]),
+        )
+        center = to_unit_sphere((south + north) / 2, west + span / 2)
+        radius = np.linalg.norm(boundary - center, axis=1).max()
+        ids = np.sort(np.asarray(
+            self.tree.query_ball_point(center, r=1.01 * radius),
+            dtype=np.int64,
+        ))
+
+        latitudes = self.latitudes[ids]
+        longitudes = self.longitudes[ids]
+        is_inside = (latitudes >= south) & (latitudes <= north)
+        if west <= east:
+            is_inside &= (longitudes >= west) & (longitudes <= east)
+        else:
+            is_inside &= (longitudes >= west) | (longitudes <= east)
+        return self.names.gather(ids[is_inside])
+
+    def pairs_within(
+        self,
+        radius: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Find every pair of nodes within `radius` kilometers, as the two
+        arrays of their positions in `names` (`i < j`).
+        '''
+        pairs = self.tree.query_pairs(
+            r=_to_chord(radius),
+            output_type='ndarray',
+        )
+        return pairs[:, 0].astype(np.int64), pairs[:, 1].astype(np.int64)
+
+    def _matches(
+        self,
+        queries: np.ndarray,
+        ids: np.ndarray,
+        chords: np.ndarray,
+    ) -> pl.DataFrame:
+        return pl.DataFrame({
+            'query': queries,
+            'name': self.names.gather(ids),
+            'distance': _to_distance(chords),
+        })
+
+
+def to_unit_sphere(
+    latitudes: np.ndarray | list[float] | float,
+    longitudes: np.ndarray | list[float] | float,
+) -> np.ndarray:
+    '''
+    Project the coordinates (in degrees) onto the unit sphere.
+    '''
+    phi = np.radians(np.asarray(latitudes, dtype=np.float64))
+    theta = np.radians(np.asarray(longitudes, dtype=np.float64))
+    return np.stack([
+        np.cos(phi) * np.cos(theta),
+        np.cos(phi) * np.sin(theta),
+        np.sin(phi),
+    ], axis=-1)
+
+
+def _to_chord(distance: float) -> float:
+    return 2 * np.sin(min(distance / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+def _to_distance(chords: np.ndarray) -> np.ndarray:
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chords / 2, 0, 1))
@@ -0,0 +1,104 @@
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+import math
+from numbers import Integral, Real
+import re
+from typing import Any
+
+from pydantic import BaseModel
+
+# NOTE: Quoted literals and identifiers are skipped, and so are `::` casts
+_TOKENS = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|::|:(\w+)")
+
+
+class PreparedQuery(BaseModel, frozen=True):
+    '''
+    A SQL query with named `:parameters`, split once around them.
+
+    Polars SQL has no bound parameters, so `bind` renders the values as
+    escaped SQL literals; the rendered queries are what the plan caches
+    are keyed by.
+    '''
+
+    parts: tuple[str, ...]
+    parameters: tuple[str, ...]
+
+    def bind(self, **values: Any) -> str:
+        missing = set(self.parameters) - values.keys()
+        if missing:
+            raise ValueError(f'Missing query parameters: {sorted(missing)}')
+        unknown = values.keys() - set(self.parameters)
+        if unknown:
+            raise ValueError(f'Unknown query parameters: {sorted(unknown)}')
+
+        chunks = [self.parts[0]]
+        for name, part in zip(self.parameters, self.parts[1:]):
+            chunks.append(to_literal(values[name]))
+            chunks.append(part)
+        return ''.join(chunks)
+
+
+@lru_cache(maxsize=256)
+def prepare(query: str) -> PreparedQuery:
+    parts = []
+    parameters = []
+    offset = 0
+    for match in _TOKENS.finditer(query):
+        if match[1] is None:
+            continue
+        parts.append(query[offset:match.start()])
+        parameters.append(match[1])
+        offset = match.end()
+    parts.append(query[offset:])
+
+    return PreparedQuery(
+        parts=tuple(parts),
+        parameters=tuple(parameters),
+    )
+
+
+def to_literal(value: Any) -> str:
+    '''
+    Render a python value as a SQL literal; sequences become `(...)` lists
+    for `IN` predicates.
+    '''
+    match value:
+        case None:
+            return 'NULL'
+        case bool():
+            return 'TRUE' if value else 'FALSE'
+        case Integral():
+            return str(int(value))
+        case Real():
+            if not math.isfinite(value):
+                raise ValueError(f'Unsupported query parameter: {value!r}')
+            return repr(float(value))
+        case str():
+            return _quote(value)
+        case datetime():
+            # NOTE: Polars casts naive strings into the zone of the column,
+            # so aware values are passed in UTC (as the series timestamps)
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return _quote(value.isoformat(sep=' '))
+        case date():
+            return f'DATE {_quote(value.isoformat())}'
+        case time():
+            return f'TIME {_quote(value.isoformat())}'
+        case timedelta():
+            microseconds = value // timedelta(microseconds=1)
+            if microseconds < 0:
+                raise ValueError(f'Unsupported query parameter: {value!r}')
+            return f'INTERVAL {_quote(f'{microseconds} microseconds')}'
+        case list() | tuple():
+            if not value:
+                raise ValueError('Empty query parameter lists are ambiguous')
+            return f'({', '.join(map(to_literal, value))})'
+        case _:
+            raise ValueError(
+                f'Unsupported query parameter type: {type(value).__name__}',
+            )
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
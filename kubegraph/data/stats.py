@@ -0,0 +1,177 @@
+import numpy as np
+import polars as pl
+from pydantic import BaseModel
+from scipy.sparse.csgraph import connected_components
+
+from kubegraph.data.adjacency import NetworkGraphAdjacency
+
+
+class NetworkGraphStatistics(BaseModel, arbitrary_types_allowed=True):
+    '''
+    Structural metrics of a network graph, shared by the summary panel and
+    the component coarsening.
+
+    `nodes` holds one row per node, in the adjacency node order: the
+    in/out degrees and capacities, the in/out flows and the utilization
+    (outflow over out capacity) when the edges carry `traffic`, and the
+    labels of the weakly and strongly connected components. `totals`
+    holds the sizes, the component counts and the flow totals.
+    '''
+
+    nodes: pl.DataFrame
+    weak_components: np.ndarray
+    strong_components: np.ndarray
+    totals: dict[str, int | float]
+
+    @classmethod
+    def from_frames(
+        cls,
+        edges: pl.DataFrame,
+        adjacency: NetworkGraphAdjacency,
+    ) -> 'NetworkGraphStatistics':
+        num_nodes = adjacency.num_nodes
+
+        def accumulate(ids: np.ndarray, key: str) -> np.ndarray:
+            values = edges.get_column(key).fill_null(0).to_numpy()
+            return np.bincount(
+                ids,
+                weights=values,
+                minlength=num_nodes,
+            ).astype(values.dtype)
+
+        columns: dict[str, np.ndarray | pl.Series] = {
+            'name': adjacency.names,
+            'in_degree': adjacency.in_degree(),
+            'out_degree': adjacency.out_degree(),
+        }
+        totals: dict[str, int | float] = {
+            'nodes': num_nodes,
+            'edges': adjacency.num_edges,
+        }
+        for key, prefix in (('capacity', '_capacity'), ('traffic', 'flow')):
+            if key not in edges.columns:
+                continue
+            columns[f'in{prefix}'] = accumulate(adjacency.end_ids, key)
+            columns[f'out{prefix}'] = accumulate(adjacency.start_ids, key)
+            totals[key] = edges.get_column(key).sum()
+
+        # NOTE: Both labelings are dense and follow the adjacency node order
+        matrix = adjacency.to_scipy()
+        num_weak, weak_components = connected_components(
+            matrix,
+            directed=True,
+            connection='weak',
+        )
+        num_strong, strong_components = connected_components(
+            matrix,
+            directed=True,
+            connection='strong',
+        )
+        totals['weak components'] = int(num_weak)
+        totals['strong components'] = int(num_strong)
+        columns['weak_component'] = weak_components
+        columns['strong_component'] = strong_components
+
+        nodes = pl.DataFrame(columns)
+        if 'out_capacity' in nodes.columns and 'outflow' in nodes.columns:
+            nodes = nodes.with_columns(
+                utilization=pl.when(pl.col('out_capacity') > 0).then(
+                    pl.col('outflow') / pl.col('out_capacity'),
+                ),
+            )
+
+        return cls(
+            nodes=nodes,
+            weak_components=weak_components,
+            strong_components=strong_components,
+            totals=totals,
+        )
+
+
+class NetworkGraphSummary(BaseModel, arbitrary_types_allowed=True):
+    '''
+    Precomputed statistics of a network graph, for the summary panel.
+
+    `nodes` and `edges` hold one row of statistics per column of the
+    frames, `degrees` counts the nodes of each in/out degree and `totals`
+    holds the sizes, the component counts and the flow totals of the
+    graph; see `NetworkGraphStatistics`.
+    '''
+
+    nodes: pl.DataFrame
+    edges: pl.DataFrame
+    degrees: pl.DataFrame
+    totals: dict[str, int | float]
+
+    @classmethod
+    def from_frames(
+        cls,
+        edges: pl.DataFrame,
+        nodes: pl.DataFrame,
+        statistics: NetworkGraphStatistics,
+    ) -> 'NetworkGraphSummary':
+        totals = dict(statistics.totals)
+        if 'traffic' in nodes.columns:
+            # NOTE: Node traffic is the supply (> 0) or the demand (< 0)
+            totals.update(nodes.select(
+                supply=pl.col('traffic').clip(lower_bound=0).sum(),
+                demand=-pl.col('traffic').clip(upper_bound=0).sum(),
+            ).row(0, named=True))
+
+        return cls(
+            nodes=_column_statistics(nodes),
+            edges=_column_statistics(edges),
+            degrees=_degree_distribution(statistics),
+            totals=totals,
+        )
+
+
+def _column_statistics(df: pl.DataFrame) -> pl.DataFrame:
+    numeric = [
+        column
+        for column, dtype in df.schema.items()
+        if dtype.is_numeric()
+    ]
+    row = df.select(
+        pl.all().null_count().name.suffix('/nulls'),
+        pl.all().approx_n_unique().name.suffix('/unique'),
+        pl.col(numeric).min().cast(pl.Float64).name.suffix('/min'),
+        pl.col(numeric).max().cast(pl.Float64).name.suffix('/max'),
+        pl.col(numeric).mean().name.suffix('/mean'),
+        pl.col(numeric).std().name.suffix('/std'),
+    ).row(0, named=True)
+
+    return pl.DataFrame(
+        [
+            {
+                'column': column,
+                'dtype': str(dtype),
+                **{
+                    key: row.get(f'{column}/{key}')
+                    for key in ('nulls', 'unique', 'min', 'max', 'mean', 'std')
+                },
+            }
+            for column, dtype in df.schema.items()
+        ],
+        schema={
+            'column': pl.String,
+            'dtype': pl.String,
+            'nulls': pl.UInt32,
+            'unique': pl.UInt32,
+            'min': pl.Float64,
+            'max': pl.Float64,
+            'mean': pl.Float64,
+            'std': pl.Float64,
+        },
+    )
+
+
+def _degree_distribution(statistics: NetworkGraphStatistics) -> pl.DataFrame:
+    in_degree = statistics.nodes.get_column('in_degree').to_numpy()
+    out_degree = statistics.nodes.get_column('out_degree').to_numpy()
+    max_degree = int(max(in_degree.max(initial=0), out_degree.max(initial=0)))
+    return pl.DataFrame({
+        'degree': np.arange(max_degree + 1),
+        'in': np.bincount(in_degree, minlength=max_degree + 1),
+        'out': np.bincount(out_degree, minlength=max_degree + 1),
+    }).filter((pl.col('in') > 0) | (pl.col('out') > 0))
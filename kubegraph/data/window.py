@@ -0,0 +1,165 @@
+import numpy as np
+import polars as pl
+
+from kubegraph.data.graph import NetworkGraph
+
+
+class RollingWindow:
+    '''
+    The rolling mean and max, and the EWMA of a vector over the last
+    `size` steps, updated in O(width) per step.
+
+    The values of the last `size` steps are kept in a ring buffer along
+    with their running sum. The max follows van Herk/Gil-Werman: once per
+    `size` steps, the ring (then holding the previous block) is scanned
+    into suffix maxima, and the window max is the max of a suffix of the
+    previous block and the running max of the current one.
+    '''
+
+    def __init__(
+        self,
+        size: int,
+        width: int,
+        alpha: float | None = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError(f'Invalid window size: {size}')
+
+        self.size = size
+        self.alpha = alpha if alpha is not None else 2 / (size + 1)
+        self.count = 0
+
+        self._values = np.zeros((size, width))
+        self._suffix = np.full((size, width), -np.inf)
+        self._prefix = np.full(width, -np.inf)
+        self._sum = np.zeros(width)
+        self._ewma = np.zeros(width)
+
+    @property
+    def ewma(self) -> np.ndarray:
+        return self._ewma
+
+    @property
+    def max(self) -> np.ndarray:
+        position = (self.count - 1) % self.size + 1
+        if position == self.size:
+            return self._prefix
+        return np.maximum(self._prefix, self._suffix[position])
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self._sum / max(min(self.count, self.size), 1)
+
+    def push(self, values: np.ndarray) -> None:
+        position = self.count % self.size
+        if position == 0 and self.count:
+            # NOTE: Once per block, which also resets the drift of the sum
+            self._suffix = np.maximum.accumulate(
+                self._values[::-1],
+                axis=0,
+            )[::-1]
+            self._sum = self._values.sum(axis=0)
+            self._prefix.fill(-np.inf)
+
+        self._sum += values - self._values[position]
+        self._values[position] = values
+        np.maximum(self._prefix, values, out=self._prefix)
+        if self.count:
+            self._ewma += self.alpha * (values - self._ewma)
+        else:
+            self._ewma[:] = values
+        self.count += 1
+
+
+class NetworkGraphSeriesWindow:
+    '''
+    Windowed metrics over the snapshots of a series, e.g. the rolling
+    mean, the EWMA and the peak of the edge `utilization` over the last
+    `size` steps.
+
+    The `traffic` of the edges and the nodes, and the `utilization`
+    (`traffic` over `capacity`) of the edges are tracked. Every snapshot
+    should have the edges and the nodes of the first one, in order, as the
+    snapshots of a series have.
+    '''
+
+    def __init__(
+        self,
+        size: int,
+        alpha: float | None = None,
+    ) -> None:
+        self.size = size
+        self.alpha = alpha
+
+        self._keys: dict[str, pl.DataFrame] = {}
+        self._windows: dict[str, dict[str, RollingWindow]] = {}
+
+    @property
+    def count(self) -> int:
+        return next(
+            (
+                window.count
+                for windows in self._windows.values()
+                for window in windows.values()
+            ),
+            0,
+        )
+
+    def edges(self) -> pl.DataFrame:
+        return self._collect('edges')
+
+    def nodes(self) -> pl.DataFrame:
+        return self._collect('nodes')
+
+    def update(self, graph: NetworkGraph) -> None:
+        self._push('edges', graph.edges, ['start', 'end'])
+        self._push('nodes', graph.nodes, ['name'])
+
+    def _collect(self, table: str) -> pl.DataFrame:
+        if table not in self._keys:
+            raise ValueError('No snapshots yet')
+        return self._keys[table].with_columns(
+            pl.Series(name=f'{key}_{metric}', values=values)
+            for key, window in self._windows[table].items()
+            for metric, values in (
+                ('mean', window.mean),
+                ('ewma', window.ewma),
+                ('max', window.max),
+            )
+        )
+
+    def _push(self, table: str, df: pl.DataFrame, keys: list[str]) -> None:
+        if table not in self._keys:
+            self._keys[table] = df.select(keys)
+        elif self._keys[table].height != df.height:
+            raise ValueError(f'The {table} of the series have changed')
+
+        metrics = _metrics_of(df)
+        windows = self._windows.setdefault(table, {})
+        for key, values in metrics.items():
+            window = windows.get(key)
+            if window is None:
+                window = windows[key] = RollingWindow(
+                    size=self.size,
+                    width=df.height,
+                    alpha=self.alpha,
+                )
+            window.push(values)
+
+
+def _metrics_of(df: pl.DataFrame) -> dict[str, np.ndarray]:
+    if 'traffic' not in df.columns:
+        return {}
+
+    traffic = df.get_column('traffic').fill_null(0).to_numpy() \
+        .astype(np.float64)
+    metrics = {'traffic': traffic}
+    if 'capacity' in df.columns:
+        capacity = df.get_column('capacity').fill_null(0).to_numpy()
+        metrics['utilization'] = np.divide(
+            traffic,
+            capacity,
+            out=np.zeros_like(traffic),
+            where=capacity > 0,
+        )
+    return metrics
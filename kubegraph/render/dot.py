@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+import subprocess
+
+from kubegraph.data.graph import NetworkGraph
+from kubegraph.render.queue import RenderQueue
+
+
+class DotEngine(Enum):
+    Dot = 'dot'
+    Sfdp = 'sfdp'
+
+    @classmethod
+    def default(cls) -> 'DotEngine':
+        return cls.Dot
+
+
+class DotRenderer:
+    '''
+    Lay out and render graphs into SVG with the Graphviz executables.
+
+    At most `max_workers` layout processes run at once and at most
+    `max_pending` renders wait for them; every process is killed after
+    `timeout` seconds. The SVGs are cached by the graph fingerprint and
+    the render options, and concurrent requests for the same render share
+    a single process.
+    '''
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 8,
+        max_edges: int = 20_000,
+        timeout: float = 30.0,
+        cache_size: int = 64,
+    ) -> None:
+        self.max_edges = max_edges
+        self.timeout = timeout
+
+        self._queue: RenderQueue[str] = RenderQueue(
+            executor=ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix='kubegraph-dot',
+            ),
+            max_workers=max_workers,
+            max_pending=max_pending,
+            cache_size=cache_size,
+        )
+
+    def render(
+        self,
+        graph: NetworkGraph,
+        engine: DotEngine | str | None = None,
+    ) -> str:
+        if engine is None:
+            engine = DotEngine.default()
+        elif isinstance(engine, str):
+            engine = DotEngine(engine)
+
+        key = (graph.fingerprint(), engine)
+        svg = self._queue.cache.get(key)
+        if svg is not None:
+            return svg
+
+        # NOTE: Degrade gracefully instead of freezing the workers
+        if graph.edges.height > self.max_edges:
+            raise ValueError(
+                f'Too many edges to render: {graph.edges.height} '
+                f'(> {self.max_edges})',
+            )
+
+        # NOTE: The source is built out of the queue lock, so that no
+        # session waits behind the source of another large graph
+        future = self._queue.submit(
+            key,
+            self._render,
+            source=graph.to_graphviz().source,
+            engine=engine,
+        )
+
+        # NOTE: Waiting in the queue is part of the budget as well
+        return future.result(timeout=2 * self.timeout)
+
+    def _render(
+        self,
+        source: str,
+        engine: DotEngine,
+    ) -> str:
+        try:
+            process = subprocess.run(
+                [engine.value, '-Tsvg'],
+                input=source.encode('utf-8'),
+                capture_output=True,
+                check=True,
+                timeout=self.timeout,
+            )
+        except subprocess.TimeoutExpired as error:
+            raise TimeoutError(
+                f'Graphviz layout timed out after {self.timeout}s',
+            ) from error
+        except subprocess.CalledProcessError as error:
+            raise ValueError(
+                f'Graphviz layout failed: {error.stderr.decode().strip()}',
+            ) from error
+        except OSError as error:
+            # NOTE: e.g. the Graphviz executables are not installed
+            raise ValueError(
+                f'Graphviz layout failed to start: {error}',
+            ) from error
+        return process.stdout.decode('utf-8')
@@ -0,0 +1,115 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from enum import Enum
+from io import BytesIO
+import multiprocessing
+import signal
+from types import FrameType
+
+from kubegraph.data.graph import NetworkGraph
+from kubegraph.render.queue import RenderQueue
+
+
+class RenderJob(Enum):
+    Graphviz = 'graphviz'
+    Matplotlib = 'matplotlib'
+    Vis = 'vis'
+
+
+class RenderPool:
+    '''
+    Render graphs in a pool of worker processes, off the script threads.
+
+    Rendering holds the GIL for long, so it would otherwise stall every
+    session served by the same process. At most `max_workers` jobs run at
+    once and at most `max_pending` jobs wait for them; every job is
+    interrupted after `timeout` seconds. The results are cached by the
+    graph fingerprint and the job, and concurrent requests for the same
+    job share a single worker.
+
+    The jobs return the Graphviz source (`str`), a PNG image (`bytes`) or
+    a vis.js HTML page (`str`).
+    '''
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 8,
+        timeout: float = 30.0,
+        cache_size: int = 64,
+    ) -> None:
+        self.timeout = timeout
+
+        # NOTE: Never fork the (multi-threaded) Streamlit server
+        self._queue: RenderQueue[bytes | str] = RenderQueue(
+            executor=ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            ),
+            max_workers=max_workers,
+            max_pending=max_pending,
+            cache_size=cache_size,
+        )
+
+    def render(
+        self,
+        graph: NetworkGraph,
+        job: RenderJob | str,
+    ) -> bytes | str:
+        # NOTE: Waiting in the queue is part of the budget as well
+        return self.submit(graph, job).result(timeout=2 * self.timeout)
+
+    def submit(
+        self,
+        graph: NetworkGraph,
+        job: RenderJob | str,
+    ) -> 'Future[bytes | str]':
+        if isinstance(job, str):
+            job = RenderJob(job)
+
+        key = (graph.fingerprint(), job)
+        value = self._queue.cache.get(key)
+        if value is not None:
+            future: Future[bytes | str] = Future()
+            future.set_result(value)
+            return future
+
+        return self._queue.submit(
+            key,
+            _render,
+            graph=graph,
+            job=job,
+            timeout=self.timeout,
+        )
+
+    def shutdown(self) -> None:
+        self._queue.shutdown()
+
+
+def _render(
+    graph: NetworkGraph,
+    job: RenderJob,
+    timeout: float,
+) -> bytes | str:
+    # NOTE: The jobs run on the main thread of the workers, so an alarm
+    # interrupts them as soon as they get back to the interpreter
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        match job:
+            case RenderJob.Graphviz:
+                return graph.to_graphviz().source
+            case RenderJob.Matplotlib:
+                buffer = BytesIO()
+                graph.draw_with_matplotlib(show=False).savefig(
+                    buffer,
+                    format='png',
+                )
+                return buffer.getvalue()
+            case RenderJob.Vis:
+                return graph.to_vis()
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _raise_timeout(signum: int, frame: FrameType | None) -> None:
+    raise TimeoutError('Rendering timed out')
@@ -0,0 +1,72 @@
+from concurrent.futures import Executor, Future
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, Hashable
+
+from kubegraph.data.cache import FingerprintCache
+
+
+class RenderQueue[T]:
+    '''
+    A bounded queue of renders in front of an executor.
+
+    At most `max_workers` renders run at once and at most `max_pending`
+    renders wait for them; any more are rejected right away. Concurrent
+    submissions of the same key share a single render, and the results
+    are put into the `cache` (which the callers check first).
+    '''
+
+    def __init__(
+        self,
+        executor: Executor,
+        max_workers: int,
+        max_pending: int,
+        cache_size: int = 64,
+    ) -> None:
+        self.cache: FingerprintCache[T] = FingerprintCache(
+            maxsize=cache_size,
+        )
+
+        self._executor = executor
+        self._inflight: dict[Hashable, Future[T]] = {}
+        self._lock = Lock()
+        self._slots = BoundedSemaphore(max_workers + max_pending)
+
+    def submit(
+        self,
+        key: Hashable,
+        fn: Callable[..., T],
+        **kwargs: Any,
+    ) -> 'Future[T]':
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+
+            if not self._slots.acquire(blocking=False):
+                raise TimeoutError('Too many pending renders')
+            try:
+                future = self._executor.submit(fn, **kwargs)
+            except BaseException:
+                self._slots.release()
+                raise
+            self._inflight[key] = future
+
+        future.add_done_callback(
+            lambda future: self._complete(key, future),
+        )
+        return future
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _complete(
+        self,
+        key: Hashable,
+        future: 'Future[T]',
+    ) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        self._slots.release()
+
+        if not future.cancelled() and future.exception() is None:
+            self.cache.put(key, future.result())
@@ -0,0 +1,61 @@
+from string import Template
+
+import polars as pl
+
+_VIS_NETWORK_URL = \
+    'https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/' \
+    'vis-network.min.js'
+
+_VIS_TEMPLATE = Template('''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<script src="$url"></script>
+<style>
+html, body, #network { width: 100%; height: 100%; margin: 0; }
+</style>
+</head>
+<body>
+<div id="network"></div>
+<script>
+new vis.Network(
+  document.getElementById('network'),
+  {
+    nodes: new vis.DataSet($nodes),
+    edges: new vis.DataSet($edges),
+  },
+  {
+    edges: { arrows: 'to', smooth: false },
+    interaction: { hideEdgesOnDrag: true, tooltipDelay: 100 },
+    physics: $physics,
+  },
+);
+</script>
+</body>
+</html>
+''')
+
+
+def render_vis_html(
+    nodes: pl.DataFrame,
+    edges: pl.DataFrame,
+    physics: bool = False,
+) -> str:
+    '''
+    Render the vis.js nodes and edges into a self-contained HTML page.
+
+    The frames are serialized as-is, so their columns should be the
+    vis.js node (`id`, `label`, `x`, ...) and edge (`from`, `to`, ...)
+    options.
+    '''
+    return _VIS_TEMPLATE.substitute(
+        url=_VIS_NETWORK_URL,
+        nodes=_to_json(nodes),
+        edges=_to_json(edges),
+        physics='true' if physics else 'false',
+    )
+
+
+def _to_json(df: pl.DataFrame) -> str:
+    # NOTE: Never close the script tag from within the data
+    return df.write_json().replace('</', '<\\/')
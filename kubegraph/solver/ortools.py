@@ -4,7 +4,9 @@ import numpy as np
 from ortools.graph.python import min_cost_flow
 import polars as pl
 
-from kubegraph.data.graph import NetworkGraph, OptimalNetworkGraph
+from kubegraph.data.graph import (
+    LazyNetworkGraph, NetworkGraph, OptimalNetworkGraph,
+)
 from kubegraph.solver.base import BaseSolver
 
 
@@ -22,10 +24,14 @@ class OrToolsSolver(BaseSolver[OptimalNetworkGraph | None]):
     @classmethod
     def with_scalar_network_graph(  # noqa: C901
         cls,
-        graph: NetworkGraph,
+        graph: NetworkGraph | LazyNetworkGraph,
     ) -> Self:
         solver = min_cost_flow.SimpleMinCostFlow()
 
+        # NOTE: Lazy graphs are only materialized when they are solved
+        if isinstance(graph, LazyNetworkGraph):
+            graph = graph.collect()
+
         # Simulate node supplies
 
         def simulate_supply(args: tuple[int, float]) -> int:
@@ -110,29 +116,21 @@ class OrToolsSolver(BaseSolver[OptimalNetworkGraph | None]):
                 how='diagonal',
             )
 
-        if 'id' not in graph.nodes.columns:
-            graph.nodes = graph.nodes.with_row_index('id')
-
-        def select_id(key: str) -> pl.Series:
-            return graph.edges.join(
-                other=graph.nodes,
-                left_on=key,
-                right_on='name',
-                how='left',
-            )['id']
+        # NOTE: Node ids follow the row order of the nodes
+        adjacency = graph.adjacency()
 
         # Add each arc.
         solver.add_arcs_with_capacity_and_unit_cost(
-            select_id('start'),  # type: ignore
-            select_id('end'),  # type: ignore
-            graph.edges['capacity'],  # type: ignore
-            graph.edges['cost'],  # type: ignore
+            adjacency.start_ids,
+            adjacency.end_ids,
+            graph.edges['capacity'].to_numpy(),
+            graph.edges['cost'].to_numpy(),
         )
 
         # Add node supplies.
         solver.set_nodes_supplies(
-            graph.nodes['id'],  # type: ignore
-            graph.nodes['supply'],  # type: ignore
+            np.arange(graph.nodes.height),
+            graph.nodes['supply'].to_numpy(),
         )
 
         return cls(
@@ -148,41 +146,36 @@ class OrToolsSolver(BaseSolver[OptimalNetworkGraph | None]):
             return None
 
         num_nodes = len(self._graph.nodes) - 2
-        node_gains = np.zeros(
-            shape=num_nodes,
-            dtype=np.uint64,
-        )
-        node_losses = np.zeros(
-            shape=num_nodes,
-            dtype=np.uint64,
-        )
+        adjacency = self._graph.adjacency()
+        edges = self._graph.edges
+
+        arcs = np.arange(self._solver.num_arcs(), dtype=np.int32)
+        flows = np.asarray(self._solver.flows(arcs), dtype=np.int64)
+        mask = (
+            (edges['start'] != '__START__') & (edges['end'] != '__END__')
+        ).to_numpy()
+
+        def accumulate(ids: np.ndarray) -> np.ndarray:
+            return np.bincount(
+                ids[mask],
+                weights=flows[mask],
+                minlength=adjacency.num_nodes,
+            )[:num_nodes].astype(np.uint64)
+
+        node_gains = accumulate(adjacency.end_ids)
+        node_losses = accumulate(adjacency.start_ids)
 
         def collect_edges() -> pl.DataFrame:
-            items = []
-            for arc in range(self._solver.num_arcs()):
-                edge = dict(zip(
-                    self._graph.edges.columns,
-                    self._graph.edges.row(arc),
-                ))
-                if edge['start'] == '__START__' or edge['end'] == '__END__':
-                    continue
-
-                cost = self._solver.unit_cost(arc)
-                traffic = self._solver.flow(arc)
-
-                node_losses[self._solver.tail(arc)] += traffic
-                node_gains[self._solver.head(arc)] += traffic
-
-                items.append({
-                    **edge,
-                    'cost': cost,
-                    'traffic': traffic,
-                })
-            return pl.DataFrame(items)
+            return edges.filter(mask).with_columns(
+                pl.Series(
+                    name='traffic',
+                    values=flows[mask],
+                ),
+            )
 
         def collect_nodes() -> pl.DataFrame:
             nodes = self._graph.nodes.clone() \
-                .drop(('id', 'supply')) \
+                .drop('supply') \
                 .slice(0, num_nodes)
 
             # NOTE: Ordered
@@ -216,13 +209,6 @@ def _update_column(
             values=values,
         )
 
-    if key in df.columns:
-        return df.replace_column(
-            index=df.get_column_index(key),
-            column=values,
-        )
-    else:
-        return df.insert_column(
-            index=len(df.columns),
-            column=values,
-        )
+    # NOTE: `replace_column` and `insert_column` work in-place, which would
+    # corrupt the (shared) frames of the source graph and its fingerprint.
+    return df.with_columns(values.alias(key))
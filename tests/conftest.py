@@ -0,0 +1,56 @@
+from typing import Any
+
+import polars as pl
+
+from kubegraph.data.graph import NetworkGraph
+from kubegraph.data.series import NetworkGraphSeries
+
+
+def sample_graph(
+    edges: dict[str, list[Any]] | None = None,
+    nodes: dict[str, list[Any]] | None = None,
+) -> NetworkGraph:
+    '''
+    A triangle of `a -> b -> c` and `a -> c`, with extra or overridden
+    `edges` and `nodes` columns.
+    '''
+    return NetworkGraph(
+        edges=pl.DataFrame({
+            'start': ['a', 'a', 'b'],
+            'end': ['b', 'c', 'c'],
+            'capacity': [100, 50, 20],
+            **(edges or {}),
+        }),
+        nodes=pl.DataFrame({
+            'name': ['a', 'b', 'c'],
+            **(nodes or {}),
+        }),
+    )
+
+
+def sample_series(
+    edges: dict[str, list[Any]] | None = None,
+    nodes: dict[str, list[Any]] | None = None,
+    **kwargs: Any,
+) -> NetworkGraphSeries:
+    '''
+    The `sample_graph` with traffic, as a series starting at the given
+    `timestamp` and `step_unit`.
+    '''
+    graph = sample_graph(
+        edges={
+            'traffic': [40, 10, 20],
+            'std': [30, 0, 10],
+            **(edges or {}),
+        },
+        nodes={
+            'traffic': [300, 0, -100],
+            'std': [20, 0, 0],
+            **(nodes or {}),
+        },
+    )
+    return NetworkGraphSeries(
+        edges=graph.edges,
+        nodes=graph.nodes,
+        **kwargs,
+    )
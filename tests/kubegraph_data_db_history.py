@@ -0,0 +1,251 @@
+from datetime import date, datetime, timezone
+import glob
+import tempfile
+import unittest
+
+import polars as pl
+
+from kubegraph.data.db.history import LocalNetworkGraphHistory
+from kubegraph.data.series import NetworkGraphSeries
+
+from conftest import sample_series
+
+
+def _sample_series() -> NetworkGraphSeries:
+    return sample_series(
+        timestamp='2024-01-01T23:00:00+09:00',
+        step_unit='6h',
+    )
+
+
+class TestCases(unittest.TestCase):
+    maxDiff = None
+
+    def test_append(self) -> None:
+        series = _sample_series()
+        with tempfile.TemporaryDirectory() as base_dir:
+            history = LocalNetworkGraphHistory(base_dir=base_dir)
+            edges, nodes = history.scan('warehouse')
+            self.assertEqual(edges.collect().height, 0)
+
+            history.append('warehouse', 'seoul', series)
+            history.append_frames('warehouse', 'seoul', *series.simulate(4))
+            history.append('warehouse', 'busan', series)
+            self.assertEqual(
+                first=len(glob.glob(f'{base_dir}/edges/*/*/*/*.parquet')),
+                second=4,
+            )
+
+            edges, nodes = history.scan('warehouse', 'seoul')
+            self.assertEqual(
+                first=nodes.select('timestamp').unique().sort('timestamp')
+                .collect().to_series().dt.to_string('iso').to_list(),
+                second=[
+                    f'2024-01-{day} {hour}:00:00.000000+00:00'
+                    for day, hour in [
+                        ('01', 14), ('01', 20), ('02', '02'), ('02', '08'),
+                        ('02', 14),
+                    ]
+                ],
+            )
+            self.assertEqual(edges.collect().height, 5 * 3)
+
+            # Only the partitions of the range are scanned
+            edges, nodes = history.scan(
+                kind='warehouse',
+                start=datetime(2024, 1, 2, 2, tzinfo=timezone.utc),
+                end='2024-01-02T14:00:00Z',
+            )
+            self.assertEqual(
+                first=edges.select('namespace', 'timestamp').unique()
+                .collect().height,
+                second=2,
+            )
+            self.assertNotIn('day=2024-01-01', edges.explain())
+
+            with self.assertRaises(ValueError):
+                history.append_frames(
+                    kind='warehouse',
+                    namespace='seoul',
+                    edges=series.edges.with_columns(
+                        timestamp=pl.lit(series.timestamp),
+                        day=pl.lit(0),
+                    ),
+                    nodes=series.nodes,
+                )
+
+    def test_schema_evolution(self) -> None:
+        series = _sample_series()
+        timestamp = pl.lit(series.timestamp).alias('timestamp')
+        edges = series.edges.with_columns(timestamp)
+        nodes = series.nodes.with_columns(timestamp)
+
+        # NOTE: The files are named at random, so try a few stores
+        for _ in range(8):
+            with tempfile.TemporaryDirectory() as base_dir:
+                history = LocalNetworkGraphHistory(base_dir=base_dir)
+                history.append_frames(
+                    kind='warehouse',
+                    namespace='seoul',
+                    edges=edges.drop('traffic', 'std'),
+                    nodes=nodes.drop('std'),
+                )
+                history.append('warehouse', 'seoul', series)
+                history.append_frames(
+                    kind='aaa',
+                    namespace='seoul',
+                    edges=edges.select('start', 'end', 'timestamp'),
+                    nodes=nodes.with_columns(pl.col('traffic') * 0.5),
+                )
+
+                edges_of, nodes_of = history.scan('warehouse')
+                self.assertEqual(
+                    first=edges_of.collect_schema().names(),
+                    second=[
+                        'start', 'end', 'capacity', 'timestamp', 'traffic',
+                        'std', 'kind', 'namespace', 'day',
+                    ],
+                )
+                self.assertEqual(
+                    first=edges_of.select(pl.col('traffic').is_null().sum())
+                    .collect().item(),
+                    second=3,
+                )
+                self.assertEqual(
+                    first=history.scan('aaa')[1]
+                    .select('traffic').collect().to_series().to_list(),
+                    second=[150.0, 0.0, -50.0],
+                )
+
+    def test_empty(self) -> None:
+        with tempfile.TemporaryDirectory() as base_dir:
+            history = LocalNetworkGraphHistory(base_dir=base_dir)
+            for every in (None, '1h', '90s'):
+                edges, nodes = history.scan('warehouse', every=every)
+                self.assertEqual(edges.collect().height, 0)
+                self.assertEqual(
+                    first=edges.collect_schema().names()[:5],
+                    second=(
+                        ['timestamp', 'start', 'end', 'kind', 'namespace']
+                        if every is None else
+                        ['timestamp', 'kind', 'namespace', 'start', 'end']
+                    ),
+                )
+                self.assertIn('name', nodes.collect().columns)
+
+    def test_rollups(self) -> None:
+        series = _sample_series().model_copy(update={'step_unit': '20m'})
+        with tempfile.TemporaryDirectory() as base_dir:
+            history = LocalNetworkGraphHistory(base_dir=base_dir)
+            for offset in range(0, 72, 9):
+                edges, nodes = series.step(offset).simulate(9)
+                history.append_frames('warehouse', 'seoul', edges, nodes)
+            history.append('warehouse', 'busan', series)
+
+            self.assertEqual(history.rollup_for('1m'), '1m')
+            self.assertEqual(history.rollup_for('2h'), '1h')
+            self.assertEqual(history.rollup_for('1w'), '1d')
+            self.assertEqual(history.rollup_for('1mo'), '1d')
+            self.assertIsNone(history.rollup_for('90s'))
+
+            raw, _ = history.scan('warehouse')
+            for every in ('15m', '2h', '1d', '90s'):
+                edges, nodes = history.scan('warehouse', every=every)
+                if (tier := history.rollup_for(every)) is not None:
+                    self.assertIn(f'rollups/{tier}/edges', edges.explain())
+                expected = raw \
+                    .group_by(
+                        pl.col('timestamp').dt.truncate(every),
+                        'kind',
+                        'namespace',
+                        'start',
+                        'end',
+                    ) \
+                    .agg(
+                        traffic_min=pl.col('traffic').min(),
+                        traffic_max=pl.col('traffic').max(),
+                        traffic_mean=pl.col('traffic').mean(),
+                        traffic_sum=pl.col('traffic').sum(),
+                    ) \
+                    .sort('timestamp', 'kind', 'namespace', 'start', 'end')
+                self.assertTrue(
+                    edges.select(expected.collect_schema().names())
+                    .collect()
+                    .equals(expected.collect()),
+                )
+                self.assertIn('std_mean', nodes.collect_schema().names())
+
+            # The partial buckets are merged by the compaction as well
+            expected = history.scan('warehouse', every='1h')[0].collect()
+            self.assertGreater(history.compact('warehouse', 'seoul'), 0)
+            self.assertTrue(
+                history.scan('warehouse', every='1h')[0].collect()
+                .equals(expected),
+            )
+
+    def test_rollups_schema_evolution(self) -> None:
+        series = _sample_series().model_copy(update={'step_unit': '20m'})
+        with tempfile.TemporaryDirectory() as base_dir:
+            history = LocalNetworkGraphHistory(base_dir=base_dir)
+            for offset, kind in enumerate(['zzz', 'aaa', 'zzz', 'aaa']):
+                edges, nodes = series.step(offset * 9).simulate(9)
+                if offset < 2:
+                    edges = edges.drop('traffic', 'std')
+                history.append_frames(kind, 'seoul', edges, nodes)
+
+            for kind in ('aaa', 'zzz'):
+                raw, _ = history.scan(kind)
+                for every in ('15m', '2h', '1d', '90s'):
+                    edges, _ = history.scan(kind, every=every)
+                    expected = raw \
+                        .group_by(
+                            pl.col('timestamp').dt.truncate(every),
+                            'kind',
+                            'namespace',
+                            'start',
+                            'end',
+                        ) \
+                        .agg(
+                            traffic_min=pl.col('traffic').min(),
+                            traffic_max=pl.col('traffic').max(),
+                            traffic_mean=pl.col('traffic').mean(),
+                            traffic_sum=pl.col('traffic').sum(),
+                            capacity_max=pl.col('capacity').max(),
+                        ) \
+                        .sort('timestamp', 'kind', 'namespace', 'start', 'end')
+                    self.assertTrue(
+                        edges.select(expected.collect_schema().names())
+                        .collect()
+                        .equals(expected.collect()),
+                    )
+
+    def test_compact(self) -> None:
+        series = _sample_series()
+        with tempfile.TemporaryDirectory() as base_dir:
+            history = LocalNetworkGraphHistory(base_dir=base_dir)
+            for snapshot in series.iter_steps(4):
+                history.append('warehouse', 'seoul', snapshot)
+            edges, _ = history.scan('warehouse')
+            expected = edges.sort('timestamp').collect()
+
+            self.assertEqual(
+                first=history.compact(
+                    kind='warehouse',
+                    namespace='seoul',
+                    before=date(2024, 1, 3),
+                ),
+                # The raw frames and the 4 rollups of both tables
+                second=2 * 5,
+            )
+            self.assertEqual(
+                first=len(glob.glob(f'{base_dir}/*/*/*/*/*.parquet')),
+                second=4,
+            )
+            edges, _ = history.scan('warehouse')
+            self.assertTrue(
+                edges.sort('timestamp').collect().equals(expected),
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,504 @@
+from io import BytesIO
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from kubegraph.data.archive import NetworkGraphArchiveFormat
+from kubegraph.data.graph import (
+    LazyNetworkGraph, NetworkGraph, OptimalNetworkGraph,
+)
+
+from conftest import sample_graph
+
+
+def _sample_graph() -> NetworkGraph:
+    return sample_graph(
+        edges={
+            'cost': [5, 3, 1],
+        },
+        nodes={
+            'traffic': [300, 0, -100],
+            'std': [20, 0, 0],
+            'cost': [20, 10, 5],
+        },
+    )
+
+
+class TestCases(unittest.TestCase):
+    maxDiff = None
+
+    def test_fingerprint(self) -> None:
+        graph = _sample_graph()
+        other = _sample_graph()
+
+        self.assertNotEqual(graph.id, other.id)
+        self.assertEqual(graph.fingerprint(), other.fingerprint())
+        self.assertEqual(graph, other)
+        self.assertEqual(hash(graph), hash(other))
+
+        other.nodes = other.nodes.head(2)
+        self.assertNotEqual(graph.fingerprint(), other.fingerprint())
+        self.assertNotEqual(graph, other)
+
+        copied = graph.model_copy(update={
+            'edges': graph.edges.head(1),
+        })
+        self.assertNotEqual(graph.fingerprint(), copied.fingerprint())
+
+    def test_adjacency(self) -> None:
+        graph = _sample_graph()
+        adjacency = graph.adjacency()
+
+        self.assertIs(adjacency, _sample_graph().adjacency())
+        self.assertEqual(adjacency.names.to_list(), ['a', 'b', 'c'])
+        self.assertEqual(adjacency.out_degree().tolist(), [2, 1, 0])
+        self.assertEqual(adjacency.in_degree().tolist(), [0, 1, 2])
+        self.assertEqual(adjacency.successors(0).tolist(), [1, 2])
+        self.assertEqual(adjacency.predecessors(2).tolist(), [0, 1])
+        self.assertEqual(
+            adjacency.edge_values(graph.edges, 'capacity').tolist(),
+            [100, 50, 20],
+        )
+
+    def test_coarsen(self) -> None:
+        graph = NetworkGraph(
+            edges=pl.DataFrame({
+                'start': ['a', 'b', 'c', 'x', 'y', 'z', 'c'],
+                'end': ['b', 'c', 'a', 'y', 'z', 'x', 'x'],
+                'capacity': [1, 2, 3, 4, 5, 6, 7],
+            }),
+            nodes=pl.DataFrame({
+                'name': ['a', 'b', 'c', 'x', 'y', 'z', '__END__'],
+                'region': ['l', 'l', 'l', 'r', 'r', 'r', 'r'],
+                'traffic': [1, 2, 3, 4, 5, 6, -21],
+            }),
+        )
+
+        summary = graph.coarsen('component')
+        self.assertEqual(summary.nodes['size'].to_list(), [6])
+        self.assertEqual(summary.edges.height, 0)
+
+        for summary in [
+            graph.coarsen('label_propagation'),
+            graph.coarsen('attribute', key='region'),
+        ]:
+            self.assertEqual(summary.nodes['size'].to_list(), [3, 3])
+            self.assertEqual(summary.nodes['traffic'].to_list(), [6, 15])
+            self.assertEqual(summary.edges['capacity'].to_list(), [7])
+
+        summary = graph.coarsen('label_propagation', max_clusters=1)
+        self.assertEqual(summary.nodes['name'].to_list(), ['(others)'])
+
+        # Many small clusters are packed into balanced buckets
+        triangles = NetworkGraph(
+            edges=pl.DataFrame({
+                'start': [f'{i}/{j}' for i in range(6) for j in range(3)],
+                'end': [f'{i}/{j}' for i in range(6) for j in (1, 2, 0)],
+                'capacity': [1] * 18,
+            }),
+            nodes=pl.DataFrame({
+                'name': [f'{i}/{j}' for i in range(6) for j in range(3)],
+            }),
+        )
+        summary = triangles.coarsen('component', max_clusters=3)
+        self.assertEqual(
+            summary.nodes.sort('name').rows(),
+            [('(others #1)', 6), ('(others #2)', 6), ('(others #3)', 6)],
+        )
+
+    def test_graphviz(self) -> None:
+        graph = _sample_graph()
+        graph.edges = graph.edges.with_columns(
+            traffic=pl.Series([100, 20, 0]),
+        )
+        graph.nodes = graph.nodes.with_columns(
+            loss=pl.Series([120, 0, 0]),
+            gain=pl.Series([0, 100, 20]),
+        )
+
+        self.assertEqual(
+            first=graph.to_graphviz().source,
+            second='\n'.join([
+                'digraph {',
+                '\ta -> b [label="100/100" color=red style=solid]',
+                '\ta -> c [label="20/50" color=yellow style=solid]',
+                '\tb -> c [label="0/20" color=yellowgreen style=solid]',
+                '\ta [label="a <-120/+0=-120>" color=blue]',
+                '\tb [label="b <-0/+100=100>" color=red]',
+                '\tc [label="c <-0/+20=20>" color=red]',
+                '}',
+                '',
+            ]),
+        )
+
+        # The fractional traffic is not truncated
+        graph.nodes = graph.nodes.with_columns(
+            loss=pl.Series([1.5, 0.0, 0.0]),
+        )
+        self.assertIn(
+            '\ta [label="a <-1.5/+0=-1.5>" color=blue]',
+            graph.to_graphviz().source,
+        )
+
+    def test_layout(self) -> None:
+        graph = _sample_graph()
+
+        for method in ('circular', 'force_directed'):
+            layout = graph.layout(method)
+            self.assertEqual(layout.columns, ['name', 'x', 'y'])
+            self.assertEqual(layout.get_column('name').to_list(),
+                             ['a', 'b', 'c'])
+            self.assertIs(graph.layout(method), layout)
+
+        # Warm start from a previous snapshot
+        layout = graph.layout()
+        graph.nodes = pl.concat([
+            graph.nodes,
+            graph.nodes.head(1).with_columns(name=pl.lit('d')),
+        ])
+        graph.edges = pl.concat([
+            graph.edges,
+            graph.edges.head(1).with_columns(start=pl.lit('c'),
+                                             end=pl.lit('d')),
+        ])
+        warm = graph.layout(initial=layout, iterations=1)
+        self.assertEqual(warm.height, 4)
+        self.assertLessEqual(
+            abs(warm.head(3).select('x', 'y').to_numpy()
+                - layout.select('x', 'y').to_numpy()).max(),
+            0.5,
+        )
+
+    def test_matplotlib(self) -> None:
+        graph = _sample_graph()
+
+        figure = graph.draw_with_matplotlib(show=False)
+        axes, = figure.axes
+        self.assertEqual(len(axes.collections), 3)
+        self.assertEqual(len(axes.collections[0].get_segments()), 3)
+
+    def test_vis(self) -> None:
+        graph = _sample_graph()
+
+        html = graph.to_vis()
+        self.assertIn('"from":"a","to":"b","title":"100"', html)
+        self.assertEqual(html.count('"label":'), 3)
+
+        # Keep the nodes and edges with the most traffic
+        html = graph.to_vis(max_nodes=2, max_edges=1)
+        self.assertIn('"id":"a"', html)
+        self.assertIn('"id":"b"', html)
+        self.assertNotIn('"id":"c"', html)
+        self.assertEqual(html.count('"from":'), 1)
+
+        # Never close the script tag from within the data
+        graph.nodes = graph.nodes.with_columns(
+            name=pl.Series(['a', 'b', '</script>c']),
+        )
+        graph.edges = graph.edges.with_columns(
+            end=pl.Series(['b', '</script>c', '</script>c']),
+        )
+        self.assertNotIn('</script>c', graph.to_vis())
+
+    def test_geojson(self) -> None:
+        graph = _sample_graph()
+        graph.edges = graph.edges.with_columns(
+            traffic=pl.Series([100, 20, 0]),
+        )
+        graph.nodes = graph.nodes.with_columns(
+            latitude=pl.Series([35.0, 35.1, 35.2]),
+            longitude=pl.Series([126.0, 126.1, 126.2]),
+        )
+
+        geojson = json.loads(graph.to_geojson())
+        self.assertEqual(geojson['type'], 'FeatureCollection')
+        self.assertEqual(len(geojson['features']), 3)
+        self.assertEqual(
+            first=geojson['features'][0]['geometry'],
+            second={'type': 'Point', 'coordinates': [126.0, 35.0]},
+        )
+        self.assertEqual(geojson['features'][0]['properties']['name'], 'a')
+
+        polylines = graph.to_polylines()
+        self.assertEqual(
+            first=sorted(polylines),
+            second=['red', 'yellow', 'yellowgreen'],
+        )
+        self.assertEqual(
+            first=polylines['red'].tolist(),
+            second=[[[35.0, 126.0], [35.1, 126.1]]],
+        )
+
+    def test_summary(self) -> None:
+        graph = _sample_graph()
+
+        summary = graph.summary()
+        self.assertIs(graph.summary(), summary)
+        self.assertEqual(
+            first=summary.totals,
+            second={
+                'nodes': 3,
+                'edges': 3,
+                'capacity': 170,
+                'weak components': 1,
+                'strong components': 3,
+                'supply': 300,
+                'demand': 100,
+            },
+        )
+        self.assertEqual(
+            first=summary.edges.filter(pl.col('column') == 'capacity')
+            .select('nulls', 'unique', 'min', 'max', 'mean')
+            .row(0),
+            second=(0, 3, 20.0, 100.0, 170 / 3),
+        )
+        self.assertEqual(
+            first=summary.degrees.rows(),
+            second=[(0, 1, 1), (1, 1, 1), (2, 1, 1)],
+        )
+
+    def test_statistics(self) -> None:
+        graph = NetworkGraph(
+            edges=pl.DataFrame({
+                'start': ['a', 'b', 'c', 'x'],
+                'end': ['b', 'c', 'a', 'y'],
+                'capacity': [100, 50, 0, 20],
+                'traffic': [40, 50, 0, 5],
+            }),
+            nodes=pl.DataFrame({
+                'name': ['a', 'b', 'c', 'x', 'y'],
+            }),
+        )
+
+        statistics = graph.statistics()
+        self.assertIs(graph.statistics(), statistics)
+        self.assertEqual(graph.summary().degrees.height, 2)
+        self.assertEqual(
+            first=statistics.nodes.drop(
+                'weak_component',
+                'strong_component',
+            ).rows(),
+            second=[
+                ('a', 1, 1, 0, 100, 0, 40, 0.4),
+                ('b', 1, 1, 100, 50, 40, 50, 1.0),
+                ('c', 1, 1, 50, 0, 50, 0, None),
+                ('x', 0, 1, 0, 20, 0, 5, 0.25),
+                ('y', 1, 0, 20, 0, 5, 0, None),
+            ],
+        )
+        self.assertEqual(
+            first=statistics.weak_components.tolist(),
+            second=[0, 0, 0, 1, 1],
+        )
+        self.assertEqual(len(set(statistics.strong_components)), 3)
+        self.assertEqual(
+            first=statistics.totals,
+            second={
+                'nodes': 5,
+                'edges': 4,
+                'capacity': 170,
+                'traffic': 95,
+                'weak components': 2,
+                'strong components': 3,
+            },
+        )
+
+    def test_spatial_index(self) -> None:
+        graph = _sample_graph()
+        graph.nodes = graph.nodes.with_columns(
+            # Seoul, Busan and Los Angeles
+            latitude=pl.Series([37.5665, 35.1796, 34.0522]),
+            longitude=pl.Series([126.9780, 129.0756, -118.2437]),
+        )
+        index = graph.spatial_index()
+        self.assertIs(graph.spatial_index(), index)
+
+        nearest = index.nearest([35.0, 34.0], [129.0, -118.0], k=2)
+        self.assertEqual(nearest['query'].to_list(), [0, 0, 1, 1])
+        self.assertEqual(nearest['name'].to_list(), ['b', 'a', 'c', 'a'])
+        self.assertAlmostEqual(nearest['distance'][1], 338, delta=1)
+
+        within = index.within_radius([37.0], [127.0], radius=400)
+        self.assertEqual(within['name'].to_list(), ['a', 'b'])
+
+        self.assertEqual(
+            index.within_bounds(30, 120, 40, 130).to_list(),
+            ['a', 'b'],
+        )
+        self.assertEqual(
+            index.within_bounds(30, 120, 40, -100).to_list(),
+            ['a', 'b', 'c'],
+        )
+        self.assertEqual(
+            index.within_bounds(30, 127, 40, 130).to_list(),
+            ['b'],
+        )
+
+        i, j = index.pairs_within(radius=400)
+        self.assertEqual((i.tolist(), j.tolist()), ([0], [1]))
+
+    def test_edge_distances(self) -> None:
+        graph = _sample_graph()
+        graph.edges = graph.edges.with_columns(
+            cost=pl.Series([5, None, None]),
+        )
+        graph.nodes = graph.nodes.with_columns(
+            latitude=pl.Series([37.5665, 35.1796, 37.5665]),
+            longitude=pl.Series([126.9780, 129.0756, 127.0780]),
+        )
+
+        edges = graph.with_edge_distances(cost_per_km=2).edges
+        self.assertAlmostEqual(edges['distance'][0], 325, delta=1)
+        self.assertAlmostEqual(edges['distance'][1], 8.8, delta=0.1)
+        self.assertEqual(edges['cost'].to_list(), [5, 18, 640])
+
+        lazy = graph.lazy().with_edge_distances().collect()
+        self.assertTrue(lazy.edges.drop('distance').equals(graph.edges))
+
+        # Connect the nodes within 100km, in both directions
+        edges = graph.with_candidate_edges(radius=100, capacity=10).edges
+        self.assertEqual(
+            first=edges.select('start', 'end', 'capacity').rows(),
+            second=[
+                ('a', 'b', 100),
+                ('a', 'c', 50),
+                ('b', 'c', 20),
+                ('c', 'a', 10),
+            ],
+        )
+        self.assertAlmostEqual(edges['distance'][3], 8.8, delta=0.1)
+
+    def test_archive(self) -> None:
+        graph = OptimalNetworkGraph(
+            **_sample_graph().model_dump(exclude={'id'}),
+            total_cost=42,
+        )
+
+        with tempfile.TemporaryDirectory() as base_dir:
+            for format in NetworkGraphArchiveFormat:
+                # in-memory
+                buffer = graph.dumps(format)
+                loaded = OptimalNetworkGraph.load(buffer)
+                self.assertEqual(graph, loaded)
+                self.assertEqual(loaded.total_cost, 42)
+
+                # the frames outlive the in-memory archive
+                buffer.close()
+                self.assertEqual(graph, loaded)
+
+                # streamed
+                data = b''.join(graph.iter_dump(format, chunk_size=16))
+                self.assertEqual(len(data) % tarfile.RECORDSIZE, 0)
+                self.assertEqual(
+                    graph,
+                    OptimalNetworkGraph.load(BytesIO(data)),
+                )
+
+                # memory-mapped
+                path = os.path.join(base_dir, f'graph.{format.value}.tar')
+                graph.dump(path, format)
+                self.assertEqual(graph, OptimalNetworkGraph.load(path))
+
+    def test_archive_compression(self) -> None:
+        graph = _sample_graph()
+
+        for compression in ['uncompressed', 'lz4', 'snappy', 'zstd']:
+            loaded = NetworkGraph.load(graph.dumps(
+                format=NetworkGraphArchiveFormat.Parquet,
+                compression=compression,  # type: ignore
+            ))
+            self.assertEqual(graph, loaded)
+
+        with self.assertRaises(ValueError):
+            graph.dumps(
+                format=NetworkGraphArchiveFormat.Arrow,
+                compression='snappy',
+            )
+
+    def test_archive_dictionary(self) -> None:
+        graph = _sample_graph()
+
+        with tarfile.open(fileobj=graph.dumps('parquet')) as tar:
+            metadata = pq.ParquetFile(
+                tar.extractfile('edges.parquet'),
+            ).metadata.row_group(0)
+            encodings = {
+                metadata.column(index).path_in_schema:
+                metadata.column(index).encodings
+                for index in range(metadata.num_columns)
+            }
+            self.assertIn('RLE_DICTIONARY', encodings['start'])
+            self.assertIn('RLE_DICTIONARY', encodings['end'])
+            self.assertNotIn('RLE_DICTIONARY', encodings['capacity'])
+
+        with tarfile.open(fileobj=graph.dumps('arrow')) as tar:
+            schema = pa.ipc.open_file(
+                tar.extractfile('nodes.arrow').read(),
+            ).schema
+            # NOTE: Kept as string views, so that they load without a copy
+            self.assertEqual(schema.field('name').type, pa.string_view())
+
+    def test_archive_pushdown(self) -> None:
+        graph = _sample_graph()
+
+        for format in NetworkGraphArchiveFormat:
+            loaded = NetworkGraph.load(
+                graph.dumps(format),
+                columns=['capacity', 'traffic'],
+                node_filter=pl.col('traffic') > 0,
+                edge_filter=pl.col('capacity') >= 50,
+            )
+            self.assertEqual(
+                loaded.edges.columns,
+                ['start', 'end', 'capacity'],
+            )
+            self.assertEqual(loaded.edges['capacity'].to_list(), [100, 50])
+            self.assertEqual(loaded.nodes.columns, ['name', 'traffic'])
+            self.assertEqual(loaded.nodes['name'].to_list(), ['a'])
+
+            # The filters may read the columns that are not loaded
+            loaded = NetworkGraph.load(
+                graph.dumps(format),
+                columns=['std'],
+                node_filter=pl.col('cost') < 20,
+                edge_filter=pl.col('cost') > 1,
+            )
+            self.assertEqual(loaded.nodes.columns, ['name', 'std'])
+            self.assertEqual(loaded.nodes['name'].to_list(), ['b', 'c'])
+            self.assertEqual(loaded.edges.columns, ['start', 'end'])
+            self.assertEqual(loaded.edges['end'].to_list(), ['b', 'c'])
+
+    def test_lazy(self) -> None:
+        graph = _sample_graph()
+
+        for streaming in [False, True]:
+            collected = graph.lazy() \
+                .filter_edges(pl.col('capacity') >= 50) \
+                .select(['capacity']) \
+                .collect(streaming=streaming)
+            self.assertEqual(
+                collected.edges.columns,
+                ['start', 'end', 'capacity'],
+            )
+            self.assertEqual(collected.edges.height, 2)
+            self.assertEqual(collected.nodes.columns, ['name'])
+
+        with tempfile.TemporaryDirectory() as base_dir:
+            edges = os.path.join(base_dir, 'edges.parquet')
+            nodes = os.path.join(base_dir, 'nodes.csv')
+            graph.edges.write_parquet(edges)
+            graph.nodes.write_csv(nodes)
+            self.assertEqual(
+                graph,
+                LazyNetworkGraph.scan(edges=edges, nodes=nodes).collect(),
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,228 @@
+from datetime import datetime, timezone
+import tempfile
+import unittest
+
+import polars as pl
+
+from kubegraph.data.db.base import NetworkGraphRef
+from kubegraph.data.db.history import LocalNetworkGraphHistory
+from kubegraph.data.series import NetworkGraphSeries
+from kubegraph.data.sql import prepare
+
+from conftest import sample_series
+
+
+def _sample_series() -> NetworkGraphSeries:
+    return sample_series(
+        edges={
+            'std': [30, 0, 100],
+        },
+        timestamp='2024-01-31T00:00:00',
+        step_unit='1mo',
+        seed=42,
+    )
+
+
+class TestCases(unittest.TestCase):
+    maxDiff = None
+
+    def test_step(self) -> None:
+        series = _sample_series()
+
+        stepped = series.step(3)
+        self.assertEqual(stepped.index, 3)
+        self.assertEqual(stepped.timestamp, '2024-04-30 00:00:00.000000')
+        self.assertEqual(stepped, next(next(next(series))))
+        self.assertEqual(stepped, series.step(1).step(2))
+        self.assertNotEqual(stepped, series.step(2))
+        self.assertIs(series.step(0), series)
+
+        # The parameters of the origin are kept
+        self.assertTrue(series.nodes.equals(_sample_series().nodes))
+        self.assertEqual(stepped.nodes['std'].to_list(), [20, 0, 0])
+
+        # Only the nodes and the edges with a deviation are drawn
+        self.assertEqual(stepped.nodes['traffic'][1:].to_list(), [0, -100])
+        self.assertEqual(stepped.edges['traffic'][1], 10)
+        self.assertTrue(
+            (stepped.edges['traffic'] <= stepped.edges['capacity']).all(),
+        )
+
+        with self.assertRaises(ValueError):
+            series.step(-1)
+
+        # An updated snapshot steps from its own fields
+        updated = stepped.model_copy(update={
+            'seed': 5,
+            'step_unit': '1d',
+            'edges': stepped.edges.with_columns(std=0),
+        })
+        this = updated.step(1)
+        self.assertEqual((this.seed, this.index), (5, 4))
+        self.assertEqual(this.timestamp, '2024-05-01 00:00:00.000000')
+        self.assertTrue(this.edges.equals(updated.edges))
+        self.assertFalse(this.nodes.equals(
+            stepped.model_copy(update={'seed': 6}).step(1).nodes,
+        ))
+
+    def test_simulate(self) -> None:
+        series = _sample_series().step(1)
+
+        edges, nodes = series.simulate(4)
+        self.assertEqual(edges.columns[:2], ['step', 'timestamp'])
+        self.assertEqual(edges.height, 4 * 3)
+        self.assertEqual(nodes['step'].unique().to_list(), [2, 3, 4, 5])
+
+        # The stacked steps match the snapshots
+        for snapshot in series.iter_steps(4):
+            self.assertTrue(
+                nodes.filter(pl.col('step') == snapshot.index)
+                .drop('step', 'timestamp')
+                .equals(snapshot.nodes),
+            )
+            self.assertTrue(
+                edges.filter(pl.col('step') == snapshot.index)
+                .drop('step', 'timestamp')
+                .equals(snapshot.edges),
+            )
+            self.assertEqual(
+                nodes.filter(pl.col('step') == snapshot.index)['timestamp']
+                .dt.to_string('iso')[0],
+                snapshot.timestamp,
+            )
+
+    def test_iter_steps(self) -> None:
+        series = _sample_series()
+
+        # Only the consumed prefix is drawn
+        snapshots = series.iter_steps()
+        self.assertEqual(
+            [next(snapshots).timestamp for _ in range(2)],
+            ['2024-02-29 00:00:00.000000', '2024-03-31 00:00:00.000000'],
+        )
+        self.assertEqual(len(list(series.iter_steps(5))), 5)
+
+    def test_sql(self) -> None:
+        series = _sample_series()
+        cache = NetworkGraphSeries.sql_cache()
+        cache.clear()
+
+        query = 'SELECT start, "end" FROM edges WHERE traffic >= :traffic'
+        plan = series.__sql__(query, traffic=20)
+        self.assertEqual(
+            first=plan.collect().rows(),
+            second=[('a', 'b'), ('b', 'c')],
+        )
+
+        # Identical graphs share the plans of the same bound queries
+        self.assertIs(_sample_series().__sql__(query, traffic=20), plan)
+        self.assertIsNot(series.__sql__(query, traffic=30), plan)
+        self.assertIsNot(series.step(1).__sql__(query, traffic=20), plan)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+        with self.assertRaises(ValueError):
+            series.__sql__(query)
+        with self.assertRaises(ValueError):
+            series.__sql__(query, traffic=20, unknown=1)
+
+    def test_sql_history(self) -> None:
+        query = '''
+            SELECT DISTINCT start, "end" FROM edges_history
+            WHERE timestamp >= :since AND traffic >= 0.8 * capacity
+            ORDER BY start, "end"
+        '''
+        with self.assertRaises(ValueError):
+            _sample_series().__sql__(query, since=datetime(2024, 1, 1))
+
+        with tempfile.TemporaryDirectory() as base_dir:
+            series = _sample_series().model_copy(update={
+                'history': LocalNetworkGraphHistory(base_dir=base_dir),
+                'ref': NetworkGraphRef(kind='warehouse', namespace='seoul'),
+            })
+            self.assertEqual(
+                first=series.__sql__(query, since=datetime(2024, 1, 1))
+                .collect().height,
+                second=0,
+            )
+
+            snapshots = list(series.iter_steps(6))
+            for snapshot in snapshots:
+                snapshot.persist()
+
+            # The frames of other kinds, or without the traffic yet, are
+            # scanned along with the snapshots but never match
+            timestamp = pl.lit('2024-06-15T00:00:00').alias('timestamp')
+            for kind in ('aaa', 'warehouse'):
+                series.history.append_frames(
+                    kind=kind,
+                    namespace='seoul',
+                    edges=series.edges.select(
+                        'start', 'end', 'capacity', timestamp,
+                        pl.lit(1.0).alias('utilization'),
+                    ),
+                    nodes=series.nodes.select('name', timestamp),
+                )
+
+            since = datetime(2024, 5, 1, tzinfo=timezone.utc)
+            expected = {
+                (start, end)
+                for snapshot in snapshots
+                if datetime.fromisoformat(snapshot.timestamp)
+                .replace(tzinfo=timezone.utc) >= since
+                for start, end, capacity, traffic in snapshot.edges
+                .select('start', 'end', 'capacity', 'traffic')
+                .iter_rows()
+                if traffic >= 0.8 * capacity
+            }
+            plan = series.__sql__(query, since=since)
+            self.assertTrue(expected)
+            self.assertEqual(set(plan.collect().rows()), expected)
+            # The predicates are pushed down into the scans of the partitions
+            self.assertRegex(
+                plan.explain(),
+                r'Parquet SCAN \[\S+/edges/kind=warehouse/[^\n]+\n'
+                r'.*PROJECT[^\n]+\n.*SELECTION: [^\n]*timestamp',
+            )
+
+            # The partitions are pruned by the predicates on their days
+            plan = series.__sql__(
+                'SELECT name, traffic FROM nodes_history WHERE day >= :day',
+                day=since.date(),
+            )
+            self.assertEqual(plan.collect().height, 4 * 3)
+            self.assertNotIn('day=2024-02', plan.explain())
+
+            # New snapshots are seen by the queries planned after them
+            snapshots[-1].step(1).persist()
+            self.assertEqual(
+                first=series.__sql__(
+                    'SELECT COUNT(*) FROM nodes_history',
+                ).collect().item(),
+                second=8 * 3,
+            )
+
+    def test_prepare(self) -> None:
+        text = "SELECT x::float, ':text' FROM nodes " \
+            'WHERE name IN :names AND time < :time AND flag = :flag'
+        query = prepare(text)
+        self.assertIs(prepare(text), query)
+        self.assertEqual(query.parameters, ('names', 'time', 'flag'))
+        self.assertEqual(
+            first=query.bind(
+                names=["it's", 'b'],
+                time=datetime(2024, 1, 1, 9, tzinfo=timezone.utc),
+                flag=None,
+            ),
+            second="SELECT x::float, ':text' FROM nodes "
+            "WHERE name IN ('it''s', 'b') "
+            "AND time < '2024-01-01 09:00:00' AND flag = NULL",
+        )
+
+        with self.assertRaises(ValueError):
+            query.bind(names=[], time=None, flag=None)
+        with self.assertRaises(ValueError):
+            query.bind(names=[object()], time=None, flag=None)
+
+
+if __name__ == '__main__':
+    unittest.main()
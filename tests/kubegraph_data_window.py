@@ -0,0 +1,94 @@
+import unittest
+
+import numpy as np
+import polars as pl
+
+from kubegraph.data.series import NetworkGraphSeries
+from kubegraph.data.window import NetworkGraphSeriesWindow, RollingWindow
+
+from conftest import sample_series
+
+
+def _sample_series() -> NetworkGraphSeries:
+    return sample_series(
+        edges={
+            'capacity': [100, 0, 20],
+        },
+        timestamp='2024-01-01T00:00:00Z',
+        step_unit='1m',
+    )
+
+
+class TestCases(unittest.TestCase):
+    maxDiff = None
+
+    def test_rolling_window(self) -> None:
+        values = np.random.default_rng(42).normal(size=(40, 5))
+        for size in (1, 4, 7):
+            window = RollingWindow(size=size, width=5, alpha=0.25)
+            for step in range(values.shape[0]):
+                window.push(values[step])
+                recent = values[max(step - size + 1, 0):step + 1]
+                np.testing.assert_allclose(window.mean, recent.mean(axis=0))
+                np.testing.assert_allclose(window.max, recent.max(axis=0))
+
+            np.testing.assert_allclose(
+                window.ewma,
+                pl.DataFrame(values)
+                .select(pl.all().ewm_mean(alpha=0.25, adjust=False))
+                .row(-1),
+            )
+
+        with self.assertRaises(ValueError):
+            RollingWindow(size=0, width=5)
+
+    def test_series_window(self) -> None:
+        series = _sample_series()
+        window = NetworkGraphSeriesWindow(size=5)
+        with self.assertRaises(ValueError):
+            window.edges()
+
+        for snapshot in series.iter_steps(12):
+            window.update(snapshot)
+        self.assertEqual(window.count, 12)
+
+        edges, _ = series.simulate(12)
+        expected = edges \
+            .with_columns(
+                utilization=pl.when(pl.col('capacity') > 0)
+                .then(pl.col('traffic') / pl.col('capacity'))
+                .otherwise(0.0),
+            ) \
+            .group_by('start', 'end', maintain_order=True) \
+            .agg(
+                pl.col('traffic').tail(5).mean().alias('traffic_mean'),
+                pl.col('utilization').tail(5).max().alias('utilization_max'),
+                pl.col('utilization').ewm_mean(alpha=2 / 6, adjust=False)
+                .last()
+                .alias('utilization_ewma'),
+            )
+        actual = window.edges()
+        self.assertEqual(
+            first=actual.columns,
+            second=[
+                'start', 'end',
+                'traffic_mean', 'traffic_ewma', 'traffic_max',
+                'utilization_mean', 'utilization_ewma', 'utilization_max',
+            ],
+        )
+        for column in expected.columns[2:]:
+            np.testing.assert_allclose(
+                actual.get_column(column).to_numpy(),
+                expected.get_column(column).to_numpy(),
+            )
+        self.assertEqual(
+            first=window.nodes().get_column('traffic_max').to_list()[1:],
+            second=[0, -100],
+        )
+
+        with self.assertRaises(ValueError):
+            window.update(series.subgraph(['a', 'b']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import os
+import unittest
+from unittest import mock
+
+from kubegraph.render.dot import DotEngine, DotRenderer
+
+from conftest import sample_graph
+
+
+class TestCases(unittest.TestCase):
+    maxDiff = None
+
+    def test_missing_executable(self) -> None:
+        renderer = DotRenderer(max_workers=1)
+
+        # NOTE: No Graphviz executables can be found in an empty PATH
+        with mock.patch.dict(os.environ, {'PATH': ''}):
+            with self.assertRaises(ValueError):
+                renderer.render(sample_graph(), DotEngine.Sfdp)
+
+    def test_too_many_edges(self) -> None:
+        renderer = DotRenderer(max_edges=2)
+        with self.assertRaises(ValueError):
+            renderer.render(sample_graph())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from kubegraph.render.pool import RenderJob, RenderPool
+
+from conftest import sample_graph
+
+
+class TestCases(unittest.TestCase):
+    maxDiff = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.pool = RenderPool(max_workers=1, max_pending=1)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.pool.shutdown()
+
+    def test_render(self) -> None:
+        graph = sample_graph()
+
+        self.assertEqual(
+            first=self.pool.render(graph, RenderJob.Graphviz),
+            second=graph.to_graphviz().source,
+        )
+        self.assertTrue(
+            self.pool.render(graph, 'matplotlib').startswith(b'\x89PNG'),
+        )
+        self.assertIn('vis.Network', self.pool.render(graph, 'vis'))
+
+        # Cached by fingerprint
+        hits = self.pool._queue.cache.hits
+        self.pool.render(sample_graph(), RenderJob.Graphviz)
+        self.assertEqual(self.pool._queue.cache.hits, hits + 1)
+
+    def test_backpressure(self) -> None:
+        graph = sample_graph()
+
+        futures = [
+            self.pool.submit(
+                graph.model_copy(update={
+                    'edges': graph.edges.with_columns(capacity=index),
+                }),
+                RenderJob.Matplotlib,
+            )
+            for index in range(2)
+        ]
+        with self.assertRaises(TimeoutError):
+            self.pool.submit(graph, RenderJob.Matplotlib)
+
+        for future in futures:
+            future.result(timeout=60)
+
+
+if __name__ == '__main__':
+    unittest.main()